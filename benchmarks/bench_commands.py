@@ -0,0 +1,346 @@
+"""Offline benchmarks for the queue related command paths.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_commands
+    python -m benchmarks.bench_commands --sizes 10 1000 --cases move cut
+
+Commands run against stub Player, Context and Message objects holding real
+TrackQueue instances. No Discord or Lavalink connection is needed. Each case
+reports throughput and, unless --no-alloc is given, the peak and retained
+memory allocated per call as measured by tracemalloc.
+"""
+import abc
+import argparse
+import asyncio
+import base64
+import struct
+import time
+import tracemalloc
+
+import discord
+import wavelink
+
+from cogs.commands.utils import Prefetch as prefetch
+from cogs.commands.utils import SearchCache as search_cache
+from cogs.commands.utils.History import history
+from cogs.commands.utils.Outbox import outbox
+from cogs.commands.utils.Player import Player
+from cogs.commands.utils.TrackQueue import TrackQueue
+from cogs.commands import Play, Queue, Move, Cut, Remove, Shuffle
+
+SIZES = (10, 100, 1_000, 10_000, 50_000)
+MIN_TIME = 0.2
+MAX_ITERATIONS = 1_000
+
+
+# --------------------
+#
+#       Stubs
+#
+# --------------------
+
+def encode_track(info: dict) -> str:
+    """Encode track info the way Lavaplayer does, as version 3 without source data."""
+    def text(value: str) -> bytes:
+        raw = value.encode()
+        return struct.pack(">H", len(raw)) + raw
+
+    def optional_text(value: str | None) -> bytes:
+        return struct.pack(">?", value is not None) + (text(value) if value is not None else b"")
+
+    body = (
+        struct.pack(">B", 3) + text(info["title"]) + text(info["author"]) + struct.pack(">q", info["length"])
+        + text(info["identifier"]) + struct.pack(">?", info["isStream"]) + optional_text(info["uri"])
+        + optional_text(info["artworkUrl"]) + optional_text(info["isrc"]) + text(info["sourceName"])
+        + struct.pack(">q", info["position"])
+    )
+    return base64.b64encode(struct.pack(">i", 1 << 30 | len(body)) + body).decode()
+
+
+def make_payload(i: int) -> dict:
+    info = {
+        "identifier": f"track{i:08d}",
+        "isSeekable": True,
+        "author": f"Artist {i % 997}",
+        "length": 180_000 + i % 120_000,
+        "isStream": False,
+        "position": 0,
+        "title": f"Benchmark track number {i}",
+        "uri": f"https://www.youtube.com/watch?v=track{i:08d}",
+        "artworkUrl": f"https://i.ytimg.com/vi/track{i:08d}/maxresdefault.jpg",
+        "isrc": None,
+        "sourceName": "youtube"
+    }
+    return {"encoded": encode_track(info), "info": info, "pluginInfo": {}, "userData": {}}
+
+
+def make_tracks(count: int) -> list[wavelink.Playable]:
+    return [wavelink.Playable(make_payload(i)) for i in range(count)]
+
+
+def make_playlist(count: int) -> wavelink.Playlist:
+    return wavelink.Playlist({
+        "info": {"name": f"Benchmark playlist {count}", "selectedTrack": -1},
+        "pluginInfo": {"url": "https://example.com/playlist"},
+        "tracks": [make_payload(i) for i in range(count)]
+    })
+
+
+class StubChannel:
+    id = 1
+
+    async def send(self, **kwargs):
+        return StubMessage(self)
+
+    async def delete_messages(self, messages):
+        pass
+
+
+class StubMessage:
+    _next_id = 0
+
+    def __init__(self, channel: StubChannel):
+        StubMessage._next_id += 1
+        self.id = StubMessage._next_id
+        self.channel = channel
+
+    async def reply(self, **kwargs):
+        return StubMessage(self.channel)
+
+    async def delete(self):
+        pass
+
+
+class StubVoiceState:
+    def __init__(self, channel):
+        self.channel = channel
+
+
+class StubAuthor:
+    id = 2
+    display_name = "Benchmark"
+    display_avatar = "https://example.com/avatar.png"
+    colour = discord.Colour.default()
+
+    def __init__(self):
+        self.voice = StubVoiceState(object())
+
+
+class StubGuild:
+    id = 3
+    name = "Benchmark guild"
+
+
+class StubContext:
+    def __init__(self, player: "StubPlayer"):
+        self.voice_client = player
+        self.author = StubAuthor()
+        self.guild = StubGuild()
+        self.channel = StubChannel()
+        self.message = StubMessage(self.channel)
+
+    async def reply(self, **kwargs):
+        return await self.message.reply(**kwargs)
+
+
+class StubPlayer:
+    enqueue_in_background = Player.enqueue_in_background
+    cancel_ingest = Player.cancel_ingest
+    _ingest = Player._ingest
+
+    def __init__(self, current: wavelink.Playable):
+        self.queue = TrackQueue()
+        self.auto_queue = TrackQueue()
+        self._ingest_tasks: set[asyncio.Task] = set()
+        self.current = current
+        self.playing = True
+        self.paused = False
+        self.position = 0
+        self.autoplay = wavelink.AutoPlayMode.disabled
+        self.text_channel = None
+
+    async def play(self, track: wavelink.Playable, **kwargs):
+        self.current = track
+        self.playing = True
+        return track
+
+    async def drain(self):
+        if self._ingest_tasks:
+            await asyncio.gather(*self._ingest_tasks)
+
+
+# --------------------
+#
+#       Cases
+#
+# --------------------
+
+class Case(abc.ABC):
+    """One benchmarked command at one queue size."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.tracks = make_tracks(size)
+        self.player = StubPlayer(self.tracks[0])
+        self.player.queue.put(self.tracks)
+
+    def ctx(self) -> StubContext:
+        return StubContext(self.player)
+
+    async def setup(self):
+        pass
+
+    @abc.abstractmethod
+    async def run(self):
+        ...
+
+
+class PlayPlaylist(Case):
+    def __init__(self, size: int):
+        super().__init__(1)
+        self.playlist = make_playlist(size)
+        self.size = size
+
+    async def setup(self):
+        self.player.queue.reset()
+        history._pending.clear()
+
+    async def run(self):
+        await Play.play(self.ctx(), "benchmark playlist")
+        await self.player.drain()
+
+
+class FairPlaylist(PlayPlaylist):
+    async def setup(self):
+        await super().setup()
+        self.player.queue.fair = True
+        # Two other listeners already have tracks queued, so the playlist is
+        # tagged against their turns and merged in between them.
+        tracks = make_tracks(50)
+        for i, track in enumerate(tracks):
+            track.extras = {"requester": 100 + i % 2}
+        self.player.queue.put(tracks)
+
+
+class RenderQueue(Case):
+    async def run(self):
+        await Queue.queue(self.ctx(), "20")
+
+
+class RenderLastPage(Case):
+    async def run(self):
+        view = Queue.QueueView(self.ctx(), self.player, 20)
+        view.page = view.page_count - 1
+        view.build_embed()
+
+
+class MoveTrack(Case):
+    async def run(self):
+        await Move.move(self.ctx(), str(self.size + 1), "3")
+
+
+class CutTrack(Case):
+    async def run(self):
+        await Cut.cut(self.ctx())
+
+
+class RemoveTrack(Case):
+    async def setup(self):
+        if len(self.player.queue) < self.size:
+            self.player.queue.put(self.tracks[0])
+
+    async def run(self):
+        await Remove.remove(self.ctx(), str(self.size // 2 + 2))
+
+
+class ShuffleQueue(Case):
+    async def run(self):
+        await Shuffle.shuffle(self.ctx())
+
+
+CASES: dict[str, type[Case]] = {
+    "play_playlist": PlayPlaylist,
+    "fair_playlist": FairPlaylist,
+    "queue": RenderQueue,
+    "queue_last_page": RenderLastPage,
+    "move": MoveTrack,
+    "cut": CutTrack,
+    "remove": RemoveTrack,
+    "shuffle": ShuffleQueue,
+}
+
+
+# --------------------
+#
+#       Runner
+#
+# --------------------
+
+async def measure_time(case: Case) -> tuple[int, float]:
+    iterations = 0
+    elapsed = 0.0
+    while iterations < MAX_ITERATIONS and (elapsed < MIN_TIME or iterations < 3):
+        await case.setup()
+        start = time.perf_counter()
+        await case.run()
+        elapsed += time.perf_counter() - start
+        iterations += 1
+    return iterations, elapsed
+
+
+async def measure_allocations(case: Case, iterations: int = 3) -> tuple[float, float]:
+    peak = retained = 0
+    for _ in range(iterations):
+        await case.setup()
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        await case.run()
+        after, top = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak = max(peak, top - before)
+        retained += after - before
+    return peak / 1024, retained / iterations / 1024
+
+
+async def benchmark(names: list[str], sizes: list[int], allocations: bool):
+    # Keep the runs offline: no artwork lookups and no Lavalink searches.
+    prefetch.look_ahead = lambda player: None
+    playlists: dict[int, wavelink.Playlist] = {}
+
+    async def search(query: str):
+        return playlists[current_size]
+
+    search_cache.search = search
+
+    print(f"{'case':<16} {'size':>7} {'runs':>6} {'ops/s':>11} {'mean':>11} {'peak KiB':>10} {'kept KiB':>10}")
+    for name in names:
+        for size in sizes:
+            current_size = size
+            case = CASES[name](size)
+            if isinstance(case, PlayPlaylist):
+                playlists[size] = case.playlist
+
+            iterations, elapsed = await measure_time(case)
+            mean = elapsed / iterations
+            line = f"{name:<16} {size:>7} {iterations:>6} {iterations / elapsed:>11.1f} {mean * 1e6:>9.1f}us"
+            if allocations:
+                peak, retained = await measure_allocations(case)
+                line += f" {peak:>10.1f} {retained:>10.1f}"
+            print(line, flush=True)
+
+    await outbox.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark queue related commands offline.")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    parser.add_argument("--no-alloc", action="store_true", help="Skip the tracemalloc pass.")
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.cases, args.sizes, not args.no_alloc))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Per-track memory of queued tracks.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --sizes 1000 100000
+
+Tracks are parsed from JSON the way Lavalink delivers them. tracemalloc then
+measures the memory each one holds as a plain list of Playable objects and
+after being put in a TrackQueue, which keeps CompactTrack entries only. A
+queue entry is also turned back into a Playable, to time how long the
+lazy decode takes right before a track plays.
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+import wavelink
+
+from benchmarks.bench_commands import make_payload
+from cogs.commands.utils.CompactTrack import CompactTrack
+from cogs.commands.utils.TrackQueue import TrackQueue
+
+SIZES = (1_000, 10_000, 50_000)
+
+
+def measure(raw: list[str], compact: bool) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracks = [wavelink.Playable(json.loads(data)) for data in raw]
+    if compact:
+        queue = TrackQueue()
+        queue.put(tracks)
+        del tracks
+        gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / len(raw)
+
+
+def measure_decode(raw: list[str], iterations: int = 1_000) -> float:
+    # A fresh queue entry per iteration, since entries keep what they decoded.
+    track = wavelink.Playable(json.loads(raw[0]))
+    entries = [CompactTrack.from_playable(track) for _ in range(iterations)]
+    start = time.perf_counter()
+    for entry in entries:
+        entry.to_playable()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-track memory of queued tracks.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    args = parser.parse_args()
+
+    print(f"{'size':>7} {'Playable B':>11} {'queued B':>11} {'saved':>7}")
+    for size in args.sizes:
+        raw = [json.dumps(make_payload(i)) for i in range(size)]
+        full = measure(raw, compact=False)
+        queued = measure(raw, compact=True)
+        print(f"{size:>7} {full:>11.0f} {queued:>11.0f} {1 - queued / full:>7.0%}", flush=True)
+
+    print(f"decode before play: {measure_decode(raw) * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+from discord.ext import commands
+
+from .commands.utils import Logger as log
+from .commands.utils.Logger import logger
+from .commands.utils import Constants as constants
+from .commands.utils.Outbox import outbox
+from .commands.utils.Player import Player
+from .commands.utils.Tracing import tracer
+
+
+class Diagnostics(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    # --------------------
+    #
+    #       Commands
+    #
+    # --------------------
+
+    # Trace
+
+    @commands.group(name="trace", invoke_without_command=True, help="Show which commands are being sampled or profiled. ")
+    @commands.has_any_role("Supreme leader", "COMP")
+    async def trace_command(self, ctx):
+        sampling = tracer.sampling.describe() if tracer.sampling else "off"
+        profiling = tracer.profiling.describe() if tracer.profiling else "off"
+        await outbox.reply(ctx, content=(
+            f"Sampling: {sampling}\n"
+            f"Profiling: {profiling}\n"
+            f"Stored traces: {len(tracer.traces)}, profile recorded: {'yes' if tracer.profile_stats else 'no'}"
+        ))
+
+    @trace_command.command(name="sample", help="Sample traces of a command or guild id, or all. - trace sample play 0.5")
+    async def trace_sample_command(self, ctx, target: str = "all", rate: float = 1.0):
+        rate = min(max(rate, 0.0), 1.0)
+        tracer.sample(None if target == "all" else target, rate)
+        logger.info("Trace sampling enabled", extra=log.fields(ctx, target=target, rate=rate))
+        await outbox.reply(ctx, content=f"Sampling {tracer.sampling.describe()}. ")
+
+    @trace_command.command(name="profile", help="Profile the next runs of a command or guild id, or all. - trace profile play 3")
+    async def trace_profile_command(self, ctx, target: str = "all", count: int = 1):
+        tracer.profile(None if target == "all" else target, max(count, 1))
+        logger.info("Command profiling enabled", extra=log.fields(ctx, target=target, count=count))
+        await outbox.reply(ctx, content=f"Profiling {tracer.profiling.describe()}. ")
+
+    @trace_command.command(name="off", help="Stop sampling and profiling. ")
+    async def trace_off_command(self, ctx):
+        tracer.stop()
+        await outbox.reply(ctx, content="Sampling and profiling stopped. ")
+
+    @trace_command.command(name="dump", help="Upload and clear the stored traces and profile. ")
+    async def trace_dump_command(self, ctx):
+        files = tracer.dump()
+        if not files:
+            await outbox.reply(ctx, content="Nothing has been recorded yet. ")
+            return
+        await outbox.reply(ctx, files=files, delete_after=None)
+
+    # Cluster
+
+    @commands.command(name="cluster", help="Show shards, guilds and players for every cluster. ")
+    @commands.has_any_role("Supreme leader", "COMP")
+    async def cluster_command(self, ctx):
+        clusters = await self.bot.global_request("stats")
+        lines = []
+        for cluster, stats in sorted(clusters.items()):
+            if stats is None:
+                lines.append(f"**{cluster}.** no answer")
+                continue
+            shards = f"{stats['shards'][0]}-{stats['shards'][-1]}" if stats["shards"] else "none"
+            lines.append(
+                f"**{cluster}.** shards {shards}, {stats['guilds']} guilds, "
+                f"{stats['playing']}/{stats['players']} playing, {stats['queued']} queued, {stats['latency_ms']} ms"
+            )
+        totals = [stats for stats in clusters.values() if stats]
+        lines.append(
+            f"Total: {sum(s['guilds'] for s in totals)} guilds, {sum(s['players'] for s in totals)} players, "
+            f"{sum(s['queued'] for s in totals)} queued"
+        )
+        await outbox.reply(ctx, content="\n".join(lines))
+
+    # Memory
+
+    @commands.command(name="memory", help="Show the tracks and estimated memory held by the largest players. ")
+    @commands.has_any_role("Supreme leader", "COMP")
+    async def memory_command(self, ctx):
+        players = [(p.footprint(), p) for p in self.bot.voice_clients if isinstance(p, Player)]
+        players.sort(key=lambda item: item[0]["bytes"], reverse=True)
+        lines = [
+            f"**{p.guild.name}** {usage['bytes'] / 1024:.0f} KiB - {usage['queue']} queued, {usage['history']} history, "
+            f"{usage['auto_queue']} autoplay, {usage['auto_history']} autoplay history, idle {p.idle:.0f}s"
+            for usage, p in players[:constants.MEMORY_TOP_GUILDS]
+        ]
+        total = sum(usage["bytes"] for usage, _ in players)
+        lines.append(f"Total: {len(players)} players, {total / 1024:.0f} KiB in tracks")
+        await outbox.reply(ctx, content="\n".join(lines))
+
+    async def cog_command_error(self, ctx, error):
+        if isinstance(error, commands.errors.CheckFailure):
+            await outbox.reply(ctx, content="You do not have the correct role for this command.")
+        elif isinstance(error, commands.BadArgument):
+            await outbox.reply(ctx, content="Invalid value. Use a command name, a guild id or all, followed by a number. ")
+        logger.info("Diagnostics command failed", extra=log.fields(ctx, error=repr(error)))
+
+
+async def setup(bot):
+    await bot.add_cog(Diagnostics(bot))
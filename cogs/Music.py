@@ -1,12 +1,21 @@
-import datetime as dt
+import time
 import typing as t
 
 import discord
 import wavelink
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 from .commands.utils import Constants as constants
-from .commands.utils import Common as common
+from .commands.utils import Nodes as nodes
+from .commands.utils import Metrics as metrics
+from .commands.utils.Tracing import tracer
+from .commands.utils.Logger import logger
+from .commands.utils.History import history, requester
+from .commands.utils import Prefetch as prefetch
+from .commands.utils.TrackIndex import track_index
+from .commands.utils import Recommender as recommender
+from .commands.utils.Presence import presence
+from .commands.utils.Player import Player
 from .commands.utils.ErrorHandler import print_error_message
 from .commands.Connect import connect_with_message
 from .commands.Disconnect import disconnect
@@ -17,8 +26,9 @@ from .commands.Queue import queue
 from .commands.NowPlaying import now_playing
 from .commands.Pause import toggle_pause
 from .commands.Next import next
-from .commands.Loop import loop
 from .commands.Shuffle import shuffle
+from .commands.Fair import fair
+from .commands.Loop import loop
 from .commands.Seek import seek
 from .commands.Volume import volume
 from .commands.Clear import clear
@@ -26,24 +36,84 @@ from .commands.Move import move
 from .commands.Cut import cut
 from .commands.Remove import remove
 from .commands.Autoplay import autoplay
-from .commands.Gegagedigedagedago import gegagedigedagedago
+from .commands.Stats import stats, top
+
+try:
+    from .commands.Gegagedigedagedago import gegagedigedagedago
+except ModuleNotFoundError as err:
+    if err.name != f"{__package__}.commands.Gegagedigedagedago":
+        raise
+    gegagedigedagedago = None
+    logger.warning("Gegagedigedagedago module is missing, the gegagedigedagedago command is disabled")
 
 class Music(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot: commands.Bot = bot
 
+    async def cog_load(self):
+        await track_index.load()
+        await recommender.recommender.load()
+        self.check_nodes.start()
+        self.flush_history.start()
+        self.reap_players.start()
+
+    async def cog_unload(self):
+        presence.close()
+        self.check_nodes.cancel()
+        self.flush_history.cancel()
+        self.reap_players.cancel()
+        await history.flush()
+        await track_index.flush()
+        await prefetch.close()
+
+    @tasks.loop(seconds=constants.NODE_CHECK_INTERVAL)
+    async def check_nodes(self):
+        await nodes.refresh_stats()
+        await nodes.failover(self.bot)
+
+    @tasks.loop(seconds=constants.HISTORY_FLUSH_INTERVAL)
+    async def flush_history(self):
+        await history.flush()
+        await track_index.flush()
+
+    @tasks.loop(seconds=constants.REAPER_INTERVAL)
+    async def reap_players(self):
+        for player in list(self.bot.voice_clients):
+            if not isinstance(player, Player):
+                continue
+            try:
+                player.trim()
+                if player.idle >= constants.IDLE_TIMEOUT:
+                    logger.info("Disconnecting idle player", extra={"guild": player.guild.name, "guild_id": player.guild.id, "idle": round(player.idle)})
+                    await player.teardown()
+            except Exception:
+                logger.exception("Failed to reap player", extra={"guild_id": player.guild.id})
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        presence.rebuild(self.bot.guilds)
+
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        presence.rebuild([guild])
+
     @commands.Cog.listener()
-    async def on_voice_state_update(self, member: discord.User, before: discord.VoiceState, after: discord.VoiceState):
-        if not member.bot and after.channel is None:
-            if not [m for m in before.channel.members if not m.bot]:
-                player: wavelink.Player = wavelink.Pool.get_node().get_player(before.channel.guild.id)
-                if player:
-                    await player.disconnect()
-                    player.cleanup()
-                    player.queue.reset()
-                    player.auto_queue.reset()
-                    if player.playing:
-                        await player.stop()
+    async def on_guild_join(self, guild: discord.Guild):
+        presence.rebuild([guild])
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        if before.channel == after.channel:
+            return
+
+        if member.id == self.bot.user.id:
+            presence.check(member.guild, after.channel)
+            return
+
+        presence.update(member, before, after)
+        player = member.guild.voice_client
+        if player is not None and player.channel in (before.channel, after.channel):
+            presence.check(member.guild, player.channel)
 
     @commands.Cog.listener()
     async def on_wavelink_track_start(self, payload: wavelink.TrackStartEventPayload) -> None:
@@ -51,17 +121,22 @@ class Music(commands.Cog):
 
         await payload.player.set_volume(constants.VOLUME)
 
-        embed = discord.Embed(
-            timestamp=dt.datetime.now(),
-            colour=discord.Colour.from_rgb(209, 112, 2)
-        )
-        embed.set_author(name="Now playing")
         track = payload.track
-        duration = track.length
-        embed.description = f":notes: {common.format_track_title(track)} ({common.format_duration(track.length)})"
-        embed.set_footer(text=track.author, icon_url=constants.BONK_IMAGE_URL)
+        logger.info("Started track", extra={"guild": player.guild.name, "guild_id": player.guild.id, "track": track.title, "track_author": track.author, "track_id": track.identifier})
+        history.record("started", player.guild.id, requester(track), track)
+        track_index.add(track)
+        player.touch()
+        if not recommender.recommended(payload.original or track):
+            recommender.recommender.observe(player.guild.id, track.identifier)
+        recommender.refill(player)
+        prefetch.look_ahead(player)
 
-        await player.text_channel.send(embed=embed, delete_after=duration/1000, silent=True)
+        player.now_playing_message.update()
+
+    @commands.Cog.listener()
+    async def on_wavelink_track_end(self, payload: wavelink.TrackEndEventPayload) -> None:
+        if isinstance(payload.player, Player):
+            payload.player.now_playing_message.update()
 
     async def cog_check(self, ctx: commands.Context):
         if isinstance(ctx.channel, discord.DMChannel):
@@ -69,6 +144,18 @@ class Music(commands.Cog):
             return False
         return True
 
+    async def cog_before_invoke(self, ctx: commands.Context):
+        ctx.invoked_at = time.perf_counter()
+        tracer.begin(ctx)
+
+    async def cog_after_invoke(self, ctx: commands.Context):
+        if isinstance(ctx.voice_client, Player):
+            ctx.voice_client.touch()
+        tracer.finish(ctx)
+        name = ctx.command.qualified_name
+        metrics.command_total.inc(name, "error" if ctx.command_failed else "ok")
+        metrics.command_duration.observe(name, value=time.perf_counter() - ctx.invoked_at)
+
     # --------------------
     #
     #       Commands
@@ -107,7 +194,7 @@ class Music(commands.Cog):
 
     # Play
 
-    @commands.command(name="play", aliases=["p"], help="Play a song. - {p}")
+    @commands.command(name="play", aliases=["p"], help="Play a song, or several separated by ; or new lines. - {p}")
     async def play_command(self, ctx: commands.Context, *, query: t.Optional[str]):
         await play(ctx, query)
 
@@ -119,7 +206,7 @@ class Music(commands.Cog):
 
     @commands.command(name="search", aliases=["ps"], help="Search on youtube and get up to 5 options. - {ps}")
     async def search_command(self, ctx: commands.Context, *, query: t.Optional[str]):
-        await search(ctx, query, self.bot)
+        await search(ctx, query)
 
     @search_command.error
     async def search_command_error(self, ctx: commands.Context, err):
@@ -168,14 +255,24 @@ class Music(commands.Cog):
 
     # Shuffle
 
-    @commands.command(name="shuffle", help="Shuffle the queue - not very random. ")
-    async def shuffle_command(self, ctx: commands.Context):
-        await shuffle(ctx)
+    @commands.command(name="shuffle", help="Shuffle the queue, a seed repeats an earlier shuffle. - shuffle 1234")
+    async def shuffle_command(self, ctx: commands.Context, seed: t.Optional[int]):
+        await shuffle(ctx, seed)
 
     @shuffle_command.error
     async def shuffle_command_error(self, ctx: commands.Context, err):
         await print_error_message(ctx, err)
 
+    # Fair
+
+    @commands.command(name="fair", aliases=["turns"], help="Toggle taking turns between requesters in the queue. - {turns}")
+    async def fair_command(self, ctx: commands.Context):
+        await fair(ctx)
+
+    @fair_command.error
+    async def fair_command_error(self, ctx: commands.Context, err):
+        await print_error_message(ctx, err)
+
     # Loop
 
     @commands.command(name="loop", aliases=["repeat"], help="Loops, can accept [song / queue / stop]. - {repeat}")
@@ -266,16 +363,37 @@ class Music(commands.Cog):
     async def autoplay_command_error(self, ctx: commands.Context, err):
         await print_error_message(ctx, err)
 
-    # Gegagedigedagedago
+    # Stats
+
+    @commands.command(name="stats", help="Show what has been played in this server. ")
+    async def stats_command(self, ctx: commands.Context):
+        await stats(ctx)
 
-    @commands.command(name="gegagedigedagedago", aliases=["gegag"], help="Play gegagedigedagedago. - {gegag}")
-    async def gegagedigedagedago_command(self, ctx: commands.Context):
-        await gegagedigedagedago(ctx)
+    @stats_command.error
+    async def stats_command_error(self, ctx: commands.Context, err):
+        await print_error_message(ctx, err)
+
+    # Top
 
-    @gegagedigedagedago_command.error
-    async def gegagedigedagedago_command_error(self, ctx: commands.Context, err):
+    @commands.command(name="top", help="Show the most played tracks in this server. ")
+    async def top_command(self, ctx: commands.Context, count: t.Optional[str] = "10"):
+        await top(ctx, count)
+
+    @top_command.error
+    async def top_command_error(self, ctx: commands.Context, err):
         await print_error_message(ctx, err)
 
+    # Gegagedigedagedago
+
+    if gegagedigedagedago is not None:
+        @commands.command(name="gegagedigedagedago", aliases=["gegag"], help="Play gegagedigedagedago. - {gegag}")
+        async def gegagedigedagedago_command(self, ctx: commands.Context):
+            await gegagedigedagedago(ctx)
+
+        @gegagedigedagedago_command.error
+        async def gegagedigedagedago_command_error(self, ctx: commands.Context, err):
+            await print_error_message(ctx, err)
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Music(bot))
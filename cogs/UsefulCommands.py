@@ -2,6 +2,10 @@ from discord.ext import commands
 import discord
 import typing as t
 
+from .commands.utils import Logger as log
+from .commands.utils.Logger import logger
+from .commands.utils.Outbox import outbox
+
 
 class NoVoiceChannel(commands.CommandError):
     pass
@@ -21,22 +25,22 @@ class UsefulCommands(commands.Cog):
     @commands.has_any_role("Supreme leader", "COMP")
     async def purge_command(self, ctx, arg):
         if arg.isdigit() == False:
-            await ctx.message.reply("You must declare a value. :slight_smile:", delete_after=60, silent=True)
+            await outbox.reply(ctx, content="You must declare a value. :slight_smile:")
         else:
             if int(arg) >= 100:
-                await ctx.message.reply("Value must be under 100.", delete_after=60, silent=True)
+                await outbox.reply(ctx, content="Value must be under 100.")
             elif int(arg) < 1:
-                await ctx.message.reply("Value must be over 0.", delete_after=60, silent=True)
+                await outbox.reply(ctx, content="Value must be over 0.")
             else:
                 await ctx.message.channel.purge(limit=int(arg)+1)
 
     @purge_command.error
     async def purge_command_error(self, ctx, error):
         if isinstance(error, commands.errors.CheckFailure):
-            await ctx.message.reply("You do not have the correct role for this command.", delete_after=60, silent=True)
+            await outbox.reply(ctx, content="You do not have the correct role for this command.")
         if isinstance(error, commands.MissingRequiredArgument):
-            await ctx.message.reply("You need to provide a value for the number of messages to be deleted. ", delete_after=60, silent=True)
-        await ctx.message.delete()
+            await outbox.reply(ctx, content="You need to provide a value for the number of messages to be deleted. ")
+        outbox.delete_later(ctx.message)
 
     # Icon
 
@@ -46,7 +50,7 @@ class UsefulCommands(commands.Cog):
             await ctx.send(ctx.message.mentions[0].display_avatar)
         else:
             await ctx.send(ctx.author.display_avatar)
-        await ctx.message.delete()
+        outbox.delete_later(ctx.message)
 
     # Invite
 
@@ -56,7 +60,7 @@ class UsefulCommands(commands.Cog):
 
         await ctx.send(content=invite_link)
 
-        await ctx.message.delete()
+        outbox.delete_later(ctx.message)
 
     # Bonkmonk
 
@@ -79,26 +83,26 @@ class UsefulCommands(commands.Cog):
         for member in ctx.author.voice.channel.members:
             if member.id == mention_id:
                 await member.move_to(channel=ch, reason="Bonk")
-                print(ctx.author, " tried to bonk ", member, ". ")
+                logger.info("Bonked member", extra=log.fields(ctx, target=str(member)))
                 message = await ctx.send(content=f"You just got bonked, <@{mention_id}>")
                 await ctx.send(content="https://tenor.com/view/bonk-gif-18805247")
 
         if message is None:
             await ctx.send(f"Psst <@{mention_id}>, <@{ctx.author.id}> tried to bonk you. ")
-            print(ctx.author, " tried to bonk ", mention, ". ")
+            logger.info("Tried to bonk member", extra=log.fields(ctx, target=mention))
 
-        await ctx.message.delete()
+        outbox.delete_later(ctx.message)
 
     @bonkmonk_command.error
     async def bonkmonk_command_error(self, ctx, error):
         if isinstance(error, commands.errors.CheckFailure):
-            await ctx.message.reply("You do not have the correct role for this command.", delete_after=60, silent=True)
+            await outbox.reply(ctx, content="You do not have the correct role for this command.")
         if isinstance(error, commands.errors.MissingPermissions):
-            await ctx.message.reply("You do not have the permission to use bonkmonk.", delete_after=60, silent=True)
+            await outbox.reply(ctx, content="You do not have the permission to use bonkmonk.")
         if isinstance(error, NoVoiceChannel):
-            await ctx.message.reply("You need to be in a voice channel to bonk the monk. ", delete_after=60, silent=True)
-        print(ctx.author, " tried to bonk the monk. ")
-        await ctx.message.delete()
+            await outbox.reply(ctx, content="You need to be in a voice channel to bonk the monk. ")
+        logger.info("Bonkmonk failed", extra=log.fields(ctx, error=repr(error)))
+        outbox.delete_later(ctx.message)
 
 
 async def setup(bot):
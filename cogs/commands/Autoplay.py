@@ -4,6 +4,7 @@ import discord
 from discord.ext import commands
 
 from .utils import Common as common
+from .utils.Outbox import outbox
 
 async def autoplay(ctx: commands.Context):
     player: wavelink.Player = common.get_player(ctx)
@@ -20,5 +21,4 @@ async def autoplay(ctx: commands.Context):
 
     embed.title = f"Recommendations has been turned {'on' if (player.autoplay == wavelink.AutoPlayMode.enabled) else 'off'}."
 
-    await ctx.message.reply(embed=embed, delete_after=60, silent=True)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed)
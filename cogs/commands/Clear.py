@@ -5,6 +5,8 @@ from discord.ext import commands
 
 from .utils.Errors import QueueIsEmpty
 from .utils import Common as common
+from .utils.Outbox import outbox
+from .utils import Tracing as tracing
 
 async def clear(ctx: commands.Context):
     player: wavelink.Player = common.get_player(ctx)
@@ -13,8 +15,10 @@ async def clear(ctx: commands.Context):
     if player.queue.is_empty:
         raise QueueIsEmpty
 
-    player.queue.reset()
-    player.auto_queue.reset()
+    with tracing.span("queue", op="clear"):
+        player.cancel_ingest()
+        player.queue.reset()
+        player.auto_queue.reset()
 
     embed = discord.Embed(
         title="Cleared the queue. ",
@@ -22,5 +26,4 @@ async def clear(ctx: commands.Context):
         timestamp=dt.datetime.now(),
     )
 
-    await ctx.message.reply(embed=embed, delete_after=60, silent=True)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed)
@@ -4,6 +4,9 @@ from discord.ext import commands
 import discord
 
 from .utils import Common as common
+from .utils.Outbox import outbox
+from .utils import Tracing as tracing
+from .utils.Player import Player
 
 async def connect_with_message(ctx: commands.Context):
     await connect(ctx)
@@ -14,14 +17,14 @@ async def connect_with_message(ctx: commands.Context):
     )
     embed.title = "Connected. "
 
-    await ctx.message.reply(embed=embed, delete_after=60, silent=True)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed)
 
 async def connect(ctx: commands.Context):
     channel: discord.VoiceChannel = common.get_user_channel(ctx)
 
     if not ctx.voice_client:
-        player: wavelink.Player = await channel.connect(cls=wavelink.Player)
+        with tracing.span("connect", channel_id=channel.id):
+            player: wavelink.Player = await channel.connect(cls=Player)
     else:
         player: wavelink.Player = ctx.voice_client
 
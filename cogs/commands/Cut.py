@@ -5,6 +5,9 @@ from discord.ext import commands
 
 from .utils.Errors import TooShort
 from .utils import Common as common
+from .utils.Outbox import outbox
+from .utils import Prefetch as prefetch
+from .utils import Tracing as tracing
 
 async def cut(ctx: commands.Context):
     player: wavelink.Player = common.get_player(ctx)
@@ -13,11 +16,9 @@ async def cut(ctx: commands.Context):
     if player.queue.count < 2:
         raise TooShort
 
-    track = player.queue.get_at(player.queue.count - 1)
-
-    player.queue.put_at(0, track)
-
-    del player.queue[player.queue.count - 1]
+    with tracing.span("queue", op="cut"):
+        track = player.queue.move(player.queue.count - 1, 0)
+    prefetch.look_ahead(player)
 
     embed = discord.Embed(
         timestamp=dt.datetime.now(),
@@ -25,5 +26,4 @@ async def cut(ctx: commands.Context):
     )
     embed.title = f"Moved the last song ({track}) to the next spot in the queue. "
 
-    await ctx.message.reply(embed=embed, delete_after=60, silent=True)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed)
@@ -1,20 +1,16 @@
 import datetime as dt
-import wavelink
 from discord.ext import commands
 import discord
 
 from .utils import Common as common
+from .utils.Outbox import outbox
+from .utils.Player import Player
 
 async def disconnect(ctx: commands.Context):
-    player: wavelink.Player = common.get_player(ctx)
+    player: Player = common.get_player(ctx)
     common.get_user_channel(ctx)
 
-    await player.disconnect()
-    player.cleanup()
-    player.queue.reset()
-    player.auto_queue.reset()
-    if player.playing:
-        await player.stop()
+    await player.teardown()
 
     embed = discord.Embed(
         timestamp=dt.datetime.now(),
@@ -22,5 +18,4 @@ async def disconnect(ctx: commands.Context):
     )
     embed.title = "Disconnected. "
 
-    await ctx.message.reply(embed=embed, delete_after=60, silent=True)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed)
@@ -0,0 +1,23 @@
+import datetime as dt
+import discord
+from discord.ext import commands
+
+from .utils import Common as common
+from .utils.Outbox import outbox
+from .utils import Prefetch as prefetch
+from .utils.Player import Player
+
+async def fair(ctx: commands.Context):
+    player: Player = common.get_player(ctx)
+
+    player.queue.fair = not player.queue.fair
+    prefetch.look_ahead(player)
+
+    embed = discord.Embed(
+        timestamp=dt.datetime.now(),
+        colour=ctx.author.colour
+    )
+
+    embed.title = f"⚖ Taking turns between requesters has been turned {'on' if player.queue.fair else 'off'}."
+
+    await outbox.reply(ctx, embed=embed)
@@ -4,6 +4,7 @@ import discord
 from discord.ext import commands
 
 from .utils import Common as common
+from .utils.Outbox import outbox
 
 async def loop(ctx: commands.Context, query: str):
     player: wavelink.Player = common.get_player(ctx)
@@ -34,6 +35,5 @@ async def loop(ctx: commands.Context, query: str):
             player.queue.mode = wavelink.QueueMode.normal
             embed.title = "⏹ Stopped loop. "
 
-    await ctx.message.reply(embed=embed, delete_after=60, silent=True)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed)
     
\ No newline at end of file
@@ -3,8 +3,11 @@ import wavelink
 import discord
 from discord.ext import commands
 
-from .utils.Errors import QueueIsEmpty, FaultyIndex, SameValue, NothingPlaying
+from .utils.Errors import QueueIsEmpty, FaultyIndex, SameValue
 from .utils import Common as common
+from .utils.Outbox import outbox
+from .utils import Prefetch as prefetch
+from .utils import Tracing as tracing
 
 async def move(ctx: commands.Context, index, dest):
     player: wavelink.Player = common.get_player(ctx)
@@ -25,30 +28,15 @@ async def move(ctx: commands.Context, index, dest):
     if index <= 1 or dest <= 1:
         raise FaultyIndex
 
-    if player.queue.count + 1 < index:
+    if index > player.queue.count:
         raise FaultyIndex
 
     if player.queue.count + 1 < dest:
         dest = player.queue.count
 
-    if player.queue.is_empty:
-        raise NothingPlaying
-
-    old_queue = player.queue.copy()
-    player.queue.clear()
-
-    count = 0
-    while not old_queue.is_empty:
-        count += 1
-        if count is not index:
-            player.queue.put(old_queue.get())
-        else:
-            move_track = old_queue.get()
-
-    if player.queue.count + 1 < dest:
-        player.queue.put(move_track)
-    else:
-        player.queue.put_at(dest - 1, move_track)
+    with tracing.span("queue", op="move"):
+        move_track = player.queue.move(index - 1, dest - 1)
+    prefetch.look_ahead(player)
 
     embed = discord.Embed(
         timestamp=dt.datetime.now(),
@@ -56,5 +44,4 @@ async def move(ctx: commands.Context, index, dest):
     )
     embed.title = f"Moved {move_track.title} to {dest + 1}. "
 
-    await ctx.message.reply(embed=embed, delete_after=60, silent=True)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed)
@@ -5,6 +5,7 @@ from discord.ext import commands
 
 from .utils.Errors import NothingPlaying
 from .utils import Common as common
+from .utils.Outbox import outbox
 
 async def next(ctx: commands.Context):
     player: wavelink.Player = common.get_player(ctx)
@@ -18,7 +19,6 @@ async def next(ctx: commands.Context):
         colour=ctx.author.colour
     )
     embed.title = "⏭ Skipped song. "
-    await ctx.message.reply(embed=embed, delete_after=60, silent=True)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed)
 
     await player.stop()
@@ -5,6 +5,8 @@ from discord.ext import commands
 
 from .utils.Errors import NothingPlaying
 from .utils import Common as common
+from .utils import Prefetch as prefetch
+from .utils.Outbox import outbox
 
 async def now_playing(ctx: commands.Context):
     player: wavelink.Player = common.get_player(ctx)
@@ -41,10 +43,10 @@ async def now_playing(ctx: commands.Context):
     embed.set_footer(
         text=f"Requested by {ctx.author.display_name}", icon_url=ctx.author.display_avatar)
 
-    if track.artwork:
-        embed.set_thumbnail(url=track.artwork)
+    thumbnail = prefetch.artwork(track)
+    if thumbnail:
+        embed.set_thumbnail(url=thumbnail)
 
     duration = track.length - player.position
 
-    await ctx.message.reply(embed=embed, delete_after=duration/1000, silent=True)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed, delete_after=duration/1000)
@@ -5,6 +5,7 @@ from discord.ext import commands
 
 from .utils.Errors import NothingPlaying
 from .utils import Common as common
+from .utils.Outbox import outbox
 
 async def toggle_pause(ctx: commands.Context):
     player: wavelink.Player = common.get_player(ctx)
@@ -24,5 +25,4 @@ async def toggle_pause(ctx: commands.Context):
 
     await player.pause()
 
-    await ctx.message.reply(embed=embed, delete_after=60, silent=True)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed)
@@ -1,13 +1,27 @@
+import asyncio
 import datetime as dt
+import re
 import wavelink
 from discord.ext import commands
 import discord
 
-from .utils.Errors import NoSongProvided, NoSongFound
+from .utils.Errors import NoSongProvided, NoSongFound, TooManyQueries
 from .utils import Constants as constants
 from .utils import Common as common
+from .utils import SearchCache as search_cache
+from .utils import Logger as log
+from .utils.Logger import logger
+from .utils.History import history
+from .utils.TrackIndex import track_index
+from .utils import Metrics as metrics
+from .utils import Prefetch as prefetch
+from .utils.Outbox import outbox
+from .utils import Tracing as tracing
+from .utils.EmbedBuilder import EmbedBuilder, track_line
 from .Connect import connect
 
+_DELIMITER = re.compile(r"[\n;]")
+
 #
 #
 #  PLAY
@@ -19,30 +33,133 @@ async def play(ctx: commands.Context, query) -> None:
     if not query:
         raise NoSongProvided
 
-    tracks: wavelink.Search = await wavelink.Playable.search(query)
+    queries = split_queries(query)
+    if len(queries) > 1:
+        await play_many(ctx, player, queries)
+        return
+
+    tracks = await resolve(queries[0])
 
     if not tracks:
         raise NoSongFound
 
     if isinstance(tracks, wavelink.Playlist):
-        await player.queue.put_wait(tracks.tracks)
-        await print_playlist_message(ctx, tracks)
-        track: wavelink.Playable = tracks.tracks[0]
-        for t in tracks.tracks:
-            log_played_song(ctx, t)
-    else:
-        track: wavelink.Playable = tracks[0]
+        await play_playlist(ctx, player, tracks)
+        return
+
+    track: wavelink.Playable = tracks[0]
+    common.set_requester(track, ctx.author)
+    with tracing.span("queue", op="put"):
         await player.queue.put_wait(track)
-        if player.playing:
-            await print_play_message(ctx, track)
-        log_played_song(ctx, track)
+    prefetch.look_ahead(player)
+    if player.playing:
+        await print_play_message(ctx, track)
+    log_played_song(ctx, track)
 
     if not player.playing:
         player.text_channel = ctx.channel
         player.autoplay = wavelink.AutoPlayMode.enabled
-        await player.play(track=track, volume=constants.VOLUME)
+        with tracing.span("lavalink", op="play"):
+            await player.play(track=track, volume=constants.VOLUME)
         del player.queue[0]
-        await ctx.message.delete()
+        outbox.delete_later(ctx.message)
+
+#
+#
+#  SPLIT_QUERIES
+#
+#
+def split_queries(query: str) -> list[str]:
+    queries = [q.strip() for q in _DELIMITER.split(query)]
+    queries = [q for q in queries if q]
+    if not queries:
+        raise NoSongProvided
+    if len(queries) > constants.MULTI_QUERY_LIMIT:
+        raise TooManyQueries
+    return queries
+
+#
+#
+#  RESOLVE
+#
+#
+async def resolve(query: str, semaphore: asyncio.Semaphore | None = None) -> wavelink.Search:
+    known = track_index.match(query)
+    if known is not None:
+        metrics.search_total.inc("local")
+        return [known]
+    if semaphore is None:
+        return await search_cache.search(query)
+    async with semaphore:
+        return await search_cache.search(query)
+
+#
+#
+#  PLAY_MANY
+#
+#
+async def play_many(ctx: commands.Context, player: wavelink.Player, queries: list[str]) -> None:
+    semaphore = asyncio.Semaphore(constants.MULTI_QUERY_CONCURRENCY)
+    with tracing.span("resolve", queries=len(queries)):
+        results = await asyncio.gather(*(resolve(q, semaphore) for q in queries), return_exceptions=True)
+
+    tracks: list[wavelink.Playable] = []
+    singles: list[wavelink.Playable] = []
+    missing: list[str] = []
+    for query, result in zip(queries, results):
+        if isinstance(result, BaseException):
+            logger.warning("Query failed", extra=log.fields(ctx, query=query, error=repr(result)))
+            missing.append(query)
+        elif not result:
+            missing.append(query)
+        elif isinstance(result, wavelink.Playlist):
+            tracks.extend(result.tracks)
+        else:
+            tracks.append(result[0])
+            singles.append(result[0])
+
+    if not tracks:
+        raise NoSongFound
+
+    for track in tracks:
+        common.set_requester(track, ctx.author)
+
+    remaining = tracks
+    if not player.playing:
+        player.text_channel = ctx.channel
+        player.autoplay = wavelink.AutoPlayMode.enabled
+        with tracing.span("lavalink", op="play"):
+            await player.play(track=remaining[0], volume=constants.VOLUME)
+        remaining = remaining[1:]
+
+    if remaining:
+        with tracing.span("queue", op="ingest", tracks=len(remaining)):
+            # The singles are indexed by log_queued_tracks, wherever they landed.
+            player.enqueue_in_background(remaining, index=False)
+    log_queued_tracks(ctx, tracks, singles)
+    await print_queued_message(ctx, tracks, missing)
+
+#
+#
+#  PLAY_PLAYLIST
+#
+#
+async def play_playlist(ctx: commands.Context, player: wavelink.Player, playlist: wavelink.Playlist) -> None:
+    remaining = playlist.tracks
+    for track in remaining:
+        common.set_requester(track, ctx.author)
+
+    if not player.playing:
+        player.text_channel = ctx.channel
+        player.autoplay = wavelink.AutoPlayMode.enabled
+        with tracing.span("lavalink", op="play"):
+            await player.play(track=remaining[0], volume=constants.VOLUME)
+        remaining = remaining[1:]
+
+    with tracing.span("queue", op="ingest", tracks=len(remaining)):
+        player.enqueue_in_background(remaining)
+    log_queued_playlist(ctx, playlist)
+    await print_playlist_message(ctx, playlist)
 
 #
 #
@@ -57,17 +174,13 @@ async def print_play_message(ctx: commands.Context, track: wavelink.Playable):
     embed.set_author(name="Added to queue")
     embed.set_footer(
         text=f"By {ctx.author.display_name}", icon_url=ctx.author.display_avatar)
-    embed.description = f":notes: {common.format_track_title(track)} ({common.format_duration(track.length)})"
+    embed.description = f":notes: {track_line(track)}"
 
-    try:
-        thumbnail = await track.artwork
-        if thumbnail:
-            embed.set_thumbnail(url=thumbnail)
-    except:
-        pass
+    thumbnail = prefetch.artwork(track)
+    if thumbnail:
+        embed.set_thumbnail(url=thumbnail)
 
-    await ctx.reply(embed=embed, delete_after=60, silent=True)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed)
 
 #
 #
@@ -85,24 +198,48 @@ async def print_playlist_message(ctx: commands.Context, tracks: wavelink.Playlis
     embed.set_footer(
         text=f"Requested by {ctx.author.display_name}", icon_url=ctx.author.display_avatar)
 
-    value = ""
-    for i, t in enumerate(tracks):
-        if len(value) > 850:
-            break
-        value += f"**{i+1}.** {common.format_track_title(t)} ({common.format_duration(t.length)})\n"
+    more = "And more"
+    builder = EmbedBuilder(embed)
+    shown = builder.add_lines(
+        "Queued songs",
+        (f"**{i+1}.** {track_line(t)}" for i, t in enumerate(tracks)),
+        max_fields=1,
+        reserve=len(more) + 20
+    )
+    if shown < len(tracks):
+        builder.add_field(name=more, value=f"{len(tracks) - shown} more tracks")
+
+    await outbox.reply(ctx, embed=embed, delete_after=600, silent=False)
 
-    embed.add_field(
-        name="Queued songs",
-        value=value,
-        inline=False
+#
+#
+#  PRINT_QUEUED_MESSAGE
+#
+#
+async def print_queued_message(ctx: commands.Context, tracks: list[wavelink.Playable], missing: list[str]):
+    embed = discord.Embed(
+        colour=ctx.author.colour,
+        timestamp=dt.datetime.now(),
+        title=f"Queued {len(tracks)} songs - {common.format_duration(sum(t.length for t in tracks))}"
     )
-    embed.add_field(
-        name="And more",
-        value=""
+
+    embed.set_footer(
+        text=f"Requested by {ctx.author.display_name}", icon_url=ctx.author.display_avatar)
+
+    more = "And more"
+    builder = EmbedBuilder(embed)
+    shown = builder.add_lines(
+        "Queued songs",
+        (f"**{i+1}.** {track_line(t)}" for i, t in enumerate(tracks)),
+        max_fields=1,
+        reserve=len(more) + 20 + (constants.EMBED_FIELD_VALUE_LIMIT if missing else 0)
     )
+    if shown < len(tracks):
+        builder.add_field(name=more, value=f"{len(tracks) - shown} more tracks")
+    if missing:
+        builder.add_lines("Nothing found for", (f"`{q}`" for q in missing), max_fields=1)
 
-    await ctx.message.reply(embed=embed, delete_after=600)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed)
 
 #
 #
@@ -110,4 +247,25 @@ async def print_playlist_message(ctx: commands.Context, tracks: wavelink.Playlis
 #
 #
 def log_played_song(ctx: commands.Context, track: wavelink.Playable):
-    print(f"{dt.datetime.now()} | {ctx.guild.name:15} | {ctx.author.nick:20} queued {track.title:30} by {track.author}")
+    logger.info("Queued track", extra=log.fields(ctx, track))
+    history.record("queued", ctx.guild.id, ctx.author.id, track)
+    track_index.add(track)
+
+#
+#
+#  LOG_QUEUED_PLAYLIST
+#
+#
+def log_queued_playlist(ctx: commands.Context, playlist: wavelink.Playlist):
+    logger.info("Queued playlist", extra=log.fields(ctx, playlist=playlist.name, tracks=len(playlist)))
+    history.record_many("queued", ctx.guild.id, ctx.author.id, playlist.tracks)
+
+#
+#
+#  LOG_QUEUED_TRACKS
+#
+#
+def log_queued_tracks(ctx: commands.Context, tracks: list[wavelink.Playable], singles: list[wavelink.Playable]):
+    logger.info("Queued tracks", extra=log.fields(ctx, tracks=len(tracks)))
+    history.record_many("queued", ctx.guild.id, ctx.author.id, tracks)
+    track_index.add_many(singles)
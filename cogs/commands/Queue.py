@@ -1,10 +1,14 @@
 import datetime as dt
+import math
 import wavelink
 import discord
 from discord.ext import commands
 
 from .utils.Errors import QueueIsEmpty, NotDigit, TooShort
+from .utils import Constants as constants
 from .utils import Common as common
+from .utils.Outbox import outbox
+from .utils.EmbedBuilder import EmbedBuilder, track_line
 
 async def queue(ctx: commands.Context, show: str):
     player: wavelink.Player = common.get_player(ctx)
@@ -20,54 +24,119 @@ async def queue(ctx: commands.Context, show: str):
     if show <= 1:
         raise TooShort
 
-    embed = discord.Embed(
-        colour=ctx.author.colour,
-        timestamp=dt.datetime.now()
-    )
-
-    embed.set_footer(
-        text=f"Requested by {ctx.author.display_name}", icon_url=ctx.author.display_avatar)
-
-    track = player.current
-
-    if player.queue.is_empty:
-        embed.title = "Queue"
-    else:
-        embed.title = f"Queue - {str(player.queue.count)} - {common.format_duration((track.length - player.position) + sum(t.length for t in player.queue))}"
-        embed.description = f"Showing up to the next {show} tracks"
-
-    value = f"**1.** {common.format_track_title(track)}  - {common.format_duration(player.position)}/{common.format_duration(track.length)}"
-
-    embed.add_field(
-        name="Currently playing",
-        value=value,
-        inline=False
-    )
-
-    fieldvalues = []
-    value = ""
-    for i, t in enumerate(player.queue):
-        if i == show-1:
-            break
-        if len(value) > 850:
-            fieldvalues.append(value)
-            value = ""
-        value += f"**{i+2}.** {common.format_track_title(t)} ({common.format_duration(t.length)})\n"
-    fieldvalues.append(value)
-
-    for i, value in enumerate(fieldvalues):
-        if (len(embed) > 5000):
-            break
-        name = "Next up"
-        if player.queue.is_empty:
-            name = "The queue is empty"
-        if i > 0:
-            name = "More"
-        embed.add_field(
-            name=name,
-            value=value,
-            inline=False
+    view = QueueView(ctx, player, min(show, constants.QUEUE_PAGE_SIZE))
+
+    view.message = await outbox.reply(ctx, embed=view.build_embed(), view=view, delete_after=None)
+
+class QueueView(discord.ui.View):
+    def __init__(self, ctx: commands.Context, player: wavelink.Player, page_size: int):
+        super().__init__(timeout=constants.QUEUE_VIEW_TIMEOUT)
+        self.ctx = ctx
+        self.player = player
+        self.page_size = page_size
+        self.page = 0
+        self.message: discord.Message | None = None
+        self._pages: dict[int, list[str]] = {}
+        self._version = player.queue.version
+
+    @property
+    def page_count(self) -> int:
+        return max(1, math.ceil(self.player.queue.count / self.page_size))
+
+    def render_page(self, page: int) -> list[str]:
+        if self._version != self.player.queue.version:
+            self._pages.clear()
+            self._version = self.player.queue.version
+
+        if page not in self._pages:
+            start = page * self.page_size
+            lines = []
+            for i, t in enumerate(self.player.queue.iter_from(start), start=start):
+                if i == start + self.page_size:
+                    break
+                lines.append(f"**{i+2}.** {track_line(t)}")
+            self._pages[page] = lines
+
+        return self._pages[page]
+
+    def build_embed(self) -> discord.Embed:
+        player = self.player
+        self.page = min(self.page, self.page_count - 1)
+
+        embed = discord.Embed(
+            colour=self.ctx.author.colour,
+            timestamp=dt.datetime.now()
         )
 
-    await ctx.message.reply(embed=embed, delete_after=60, silent=True)
-    await ctx.message.delete()
+        embed.set_footer(
+            text=f"Page {self.page + 1}/{self.page_count} - Requested by {self.ctx.author.display_name}", icon_url=self.ctx.author.display_avatar)
+
+        track = player.current
+        remaining = (track.length - player.position) if track else 0
+
+        if player.queue.is_empty:
+            embed.title = "Queue"
+        else:
+            embed.title = f"Queue - {str(player.queue.count)} - {common.format_duration(remaining + player.queue.duration)}"
+
+        if track:
+            embed.add_field(
+                name="Currently playing",
+                value=f"**1.** {common.format_track_title(track)}  - {common.format_duration(player.position)}/{common.format_duration(track.length)}",
+                inline=False
+            )
+
+        builder = EmbedBuilder(embed)
+        if player.queue.is_empty:
+            builder.add_field(name="The queue is empty", value="\u200b")
+        else:
+            builder.add_lines("Next up", self.render_page(self.page))
+
+        self.first_page.disabled = self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.last_page.disabled = self.page >= self.page_count - 1
+
+        return embed
+
+    async def show_page(self, interaction: discord.Interaction, page: int):
+        self.page = max(0, page)
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user == self.ctx.author
+
+    async def on_timeout(self):
+        if self.message:
+            outbox.delete_later(self.message, 0)
+
+    @discord.ui.button(emoji="⏮", style=discord.ButtonStyle.secondary)
+    async def first_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show_page(interaction, 0)
+
+    @discord.ui.button(emoji="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show_page(interaction, self.page - 1)
+
+    @discord.ui.button(label="Jump", style=discord.ButtonStyle.primary)
+    async def jump_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_modal(JumpModal(self))
+
+    @discord.ui.button(emoji="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show_page(interaction, self.page + 1)
+
+    @discord.ui.button(emoji="⏭", style=discord.ButtonStyle.secondary)
+    async def last_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show_page(interaction, self.page_count - 1)
+
+class JumpModal(discord.ui.Modal, title="Jump to page"):
+    page = discord.ui.TextInput(label="Page", max_length=6)
+
+    def __init__(self, view: QueueView):
+        super().__init__()
+        self.queue_view = view
+
+    async def on_submit(self, interaction: discord.Interaction):
+        if not self.page.value.isdigit():
+            await interaction.response.defer()
+            return
+        await self.queue_view.show_page(interaction, int(self.page.value) - 1)
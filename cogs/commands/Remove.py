@@ -5,6 +5,9 @@ from discord.ext import commands
 
 from .utils.Errors import QueueIsEmpty, FaultyIndex
 from .utils import Common as common
+from .utils.Outbox import outbox
+from .utils import Prefetch as prefetch
+from .utils import Tracing as tracing
 
 async def remove(ctx: commands.Context, index):
     player: wavelink.Player = common.get_player(ctx)
@@ -21,11 +24,13 @@ async def remove(ctx: commands.Context, index):
     if index < 1:
         raise FaultyIndex
 
-    if player.queue.count + 1 < index:
+    if index > player.queue.count:
         raise FaultyIndex
 
-    track: wavelink.Playable = player.queue.get_at(index)
-    del player.queue[index]
+    with tracing.span("queue", op="remove"):
+        track: wavelink.Playable = player.queue[index - 1]
+        del player.queue[index - 1]
+    prefetch.look_ahead(player)
 
     embed = discord.Embed(
         timestamp=dt.datetime.now(),
@@ -33,5 +38,4 @@ async def remove(ctx: commands.Context, index):
     )
     embed.title = f"Removed {track.title} from the queue. "
 
-    await ctx.message.reply(embed=embed, delete_after=60, silent=True)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed)
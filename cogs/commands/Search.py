@@ -3,69 +3,134 @@ import datetime as dt
 import discord
 import wavelink
 import asyncio
+import functools
 from discord.ext import commands
 
 from .utils.Errors import NoSongProvided, NoSongFound, NoSongPlaylistInstead
 from .utils import Constants as constants
 from .utils import Common as common
+from .utils import SearchCache as search_cache
+from .utils import Prefetch as prefetch
+from .utils.Outbox import outbox
+from .utils.TrackIndex import track_index
+from .utils import Tracing as tracing
+from .utils.EmbedBuilder import track_line
 from .Play import print_play_message, log_played_song
 from .Connect import connect
 
-async def search(ctx: commands.Context, query: str, bot: commands.Bot):
-    def _check(r, u):
-        return (
-            r.emoji in constants.OPTIONS.keys()
-            and u == ctx.author
-            and r.message.id == message.id
-        )
-
+async def search(ctx: commands.Context, query: str):
     if not query:
         raise NoSongProvided
 
-    tracks: wavelink.Search = await wavelink.Playable.search(query)
+    # Tracks played before can be picked right away while Lavalink is searching.
+    local = [t for _, t in track_index.search(query, limit=constants.TRACK_INDEX_SUGGESTIONS)]
+    search_task = asyncio.create_task(search_cache.search(query))
+    message = None
+    view = None
 
-    if not tracks:
-        raise NoSongFound
+    try:
+        if local:
+            view = SearchView(ctx, local)
+            message = await ctx.message.reply(embed=build_search_embed(ctx, local, searching=True), view=view)
+            waiter = asyncio.create_task(view.wait())
+            await asyncio.wait({search_task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            if view.answered:
+                search_task.cancel()
+            else:
+                view.stop()
 
-    if isinstance(tracks, wavelink.Playlist):
-        raise NoSongPlaylistInstead
+        if view is None or not view.answered:
+            tracks: wavelink.Search = await search_task
+            remote = [] if isinstance(tracks, wavelink.Playlist) else list(tracks or [])
 
-    embed = discord.Embed(
-        title="Choose a song",
-        description=(
-            "\n".join(
-                f"**{i+1}.** {common.format_track_title(t)} ({common.format_duration(t.length)})" for i, t in enumerate(tracks[:5]))
-        ),
-        colour=ctx.author.colour,
-        timestamp=dt.datetime.now()
-    )
-    embed.set_author(name="Query Results")
-    embed.set_footer(text=f"Queried by {ctx.author.display_name}", icon_url=ctx.author.display_avatar)
+            seen = set()
+            options = []
+            for track in local + remote:
+                if track.identifier not in seen:
+                    seen.add(track.identifier)
+                    options.append(track)
+            options = options[:len(constants.OPTIONS)]
 
-    message = await ctx.message.reply(embed=embed)
+            if not options:
+                if isinstance(tracks, wavelink.Playlist):
+                    raise NoSongPlaylistInstead
+                raise NoSongFound
 
-    for emoji in list(constants.OPTIONS.keys())[:min(len(tracks), len(constants.OPTIONS))]:
-        await message.add_reaction(emoji)
+            view = SearchView(ctx, options)
+            if message is None:
+                message = await ctx.message.reply(embed=build_search_embed(ctx, options), view=view)
+            else:
+                await message.edit(embed=build_search_embed(ctx, options), view=view)
+            await view.wait()
+    except BaseException:
+        search_task.cancel()
+        if message is not None:
+            outbox.delete_later(message, 0)
+        raise
 
-    try:
-        reaction, _ = await bot.wait_for("reaction_add", timeout=60.0, check=_check)
-    except asyncio.TimeoutError:
-        await message.delete()
-        await ctx.message.delete()
+    outbox.delete_later(message, 0)
+    if view.choice is None:
+        outbox.delete_later(ctx.message)
         return
 
-    await message.delete()
     player: wavelink.Player = await connect(ctx)
-    track = tracks[constants.OPTIONS[reaction.emoji]]
-    track: wavelink.Playable = tracks[0]
-    await player.queue.put_wait(track)
+    track: wavelink.Playable = view.tracks[view.choice]
+    common.set_requester(track, ctx.author)
+    with tracing.span("queue", op="put"):
+        await player.queue.put_wait(track)
+    prefetch.look_ahead(player)
     log_played_song(ctx, track)
 
     if not player.playing:
         player.text_channel = ctx.channel
         player.autoplay = wavelink.AutoPlayMode.enabled
-        await player.play(track=track, volume=constants.VOLUME)
+        with tracing.span("lavalink", op="play"):
+            await player.play(track=track, volume=constants.VOLUME)
         del player.queue[0]
-        await ctx.message.delete()
+        outbox.delete_later(ctx.message)
     else:
         await print_play_message(ctx, track)
+
+#
+#
+#  BUILD_SEARCH_EMBED
+#
+#
+def build_search_embed(ctx: commands.Context, tracks: list[wavelink.Playable], searching: bool = False) -> discord.Embed:
+    embed = discord.Embed(
+        title="Choose a song",
+        description="\n".join(f"**{i+1}.** {track_line(t)}" for i, t in enumerate(tracks)),
+        colour=ctx.author.colour,
+        timestamp=dt.datetime.now()
+    )
+    embed.set_author(name="Played before - still searching" if searching else "Query Results")
+    embed.set_footer(text=f"Queried by {ctx.author.display_name}", icon_url=ctx.author.display_avatar)
+    return embed
+
+class SearchView(discord.ui.View):
+    def __init__(self, ctx: commands.Context, tracks: list[wavelink.Playable]):
+        super().__init__(timeout=constants.SEARCH_VIEW_TIMEOUT)
+        self.ctx = ctx
+        self.tracks = tracks
+        self.choice: int | None = None
+        self.answered = False
+
+        for emoji, index in list(constants.OPTIONS.items())[:len(tracks)]:
+            button = discord.ui.Button(emoji=emoji, style=discord.ButtonStyle.secondary)
+            button.callback = functools.partial(self.choose, index)
+            self.add_item(button)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user == self.ctx.author
+
+    async def choose(self, index: int, interaction: discord.Interaction):
+        self.choice = index
+        self.answered = True
+        await interaction.response.defer()
+        self.stop()
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.danger, row=1)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.answered = True
+        await interaction.response.defer()
+        self.stop()
@@ -5,6 +5,7 @@ from discord.ext import commands
 
 from .utils.Errors import NothingPlaying, InvalidTimeString, InvalidPosition
 from .utils import Common as common
+from .utils.Outbox import outbox
 
 async def seek(ctx: commands.Context, position: str):
     player: wavelink.Player = common.get_player(ctx)
@@ -27,5 +28,4 @@ async def seek(ctx: commands.Context, position: str):
         title=f"Seeked {position} seconds into the song. "
     )
 
-    await ctx.message.reply(embed=embed, delete_after=60, silent=True)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed)
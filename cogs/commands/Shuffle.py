@@ -5,20 +5,25 @@ from discord.ext import commands
 
 from .utils.Errors import QueueIsEmpty
 from .utils import Common as common
+from .utils.Outbox import outbox
+from .utils import Prefetch as prefetch
+from .utils import Tracing as tracing
 
-async def shuffle(ctx: commands.Context):
+async def shuffle(ctx: commands.Context, seed: int | None = None):
     player: wavelink.Player = common.get_player(ctx)
 
     if player.queue.is_empty:
         raise QueueIsEmpty
     
-    player.queue.shuffle()
+    with tracing.span("queue", op="shuffle"):
+        seed = player.queue.shuffle(seed)
+    prefetch.look_ahead(player)
 
     embed = discord.Embed(
         timestamp=dt.datetime.now(),
         colour=ctx.author.colour
     )
     embed.title = "🔀 Shuffled the queue. "
+    embed.set_footer(text=f"Seed {seed}")
 
-    await ctx.message.reply(embed=embed, delete_after=60, silent=True)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed)
@@ -0,0 +1,89 @@
+import datetime as dt
+import discord
+from discord.ext import commands
+
+from .utils.Errors import NoHistory, NotDigit, TooShort
+from .utils import Constants as constants
+from .utils import Common as common
+from .utils.Outbox import outbox
+from .utils.History import history
+from .utils.EmbedBuilder import EmbedBuilder
+
+async def stats(ctx: commands.Context):
+    await history.flush()
+
+    guild_rows = await history.query(
+        "SELECT queued, started, played_ms, tracks FROM guild_stats WHERE guild_id = ?",
+        (ctx.guild.id,)
+    )
+
+    if not guild_rows:
+        raise NoHistory
+
+    user_rows = await history.query(
+        "SELECT queued, started, played_ms FROM user_stats WHERE guild_id = ? AND user_id = ?",
+        (ctx.guild.id, ctx.author.id)
+    )
+
+    queued, started, played_ms, tracks = guild_rows[0]
+
+    embed = discord.Embed(
+        title=f"Stats for {ctx.guild.name}",
+        colour=ctx.author.colour,
+        timestamp=dt.datetime.now()
+    )
+
+    embed.add_field(
+        name="Server",
+        value=f"{queued} queued - {started} played - {tracks} different tracks - {common.format_duration(played_ms)} listened",
+        inline=False
+    )
+
+    if user_rows:
+        queued, started, played_ms = user_rows[0]
+        embed.add_field(
+            name=ctx.author.display_name,
+            value=f"{queued} queued - {started} played - {common.format_duration(played_ms)} listened",
+            inline=False
+        )
+
+    embed.set_footer(
+        text=f"Requested by {ctx.author.display_name}", icon_url=ctx.author.display_avatar)
+
+    await outbox.reply(ctx, embed=embed)
+
+async def top(ctx: commands.Context, count: str):
+    if not count.isdigit():
+        raise NotDigit
+
+    count = int(count)
+
+    if count < 1:
+        raise TooShort
+
+    await history.flush()
+
+    rows = await history.query(
+        "SELECT title, uri, started, queued FROM track_stats WHERE guild_id = ? "
+        "ORDER BY started DESC, queued DESC LIMIT ?",
+        (ctx.guild.id, min(count, constants.TOP_TRACKS_MAX))
+    )
+
+    if not rows:
+        raise NoHistory
+
+    embed = discord.Embed(
+        title=f"Top tracks in {ctx.guild.name}",
+        colour=ctx.author.colour,
+        timestamp=dt.datetime.now()
+    )
+
+    embed.set_footer(
+        text=f"Requested by {ctx.author.display_name}", icon_url=ctx.author.display_avatar)
+
+    EmbedBuilder(embed).add_lines(
+        "Most played",
+        (f"**{i+1}.** [{title}]({uri}) - {started} plays, {queued} queued" for i, (title, uri, started, queued) in enumerate(rows))
+    )
+
+    await outbox.reply(ctx, embed=embed)
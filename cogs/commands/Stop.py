@@ -5,6 +5,7 @@ import discord
 
 from .utils.Errors import NothingPlaying
 from .utils import Common as common
+from .utils.Outbox import outbox
 
 async def stop(ctx: commands.Context):
     player: wavelink.Player = common.get_player(ctx)
@@ -13,6 +14,7 @@ async def stop(ctx: commands.Context):
     if not player.playing and player.queue.is_empty:
         raise NothingPlaying
 
+    player.cancel_ingest()
     player.queue.reset()
     player.auto_queue.reset()
 
@@ -24,5 +26,4 @@ async def stop(ctx: commands.Context):
     )
     embed.title = "Stopped the player and cleared the queue. "
 
-    await ctx.message.reply(embed=embed, delete_after=60, silent=True)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed)
@@ -5,6 +5,7 @@ from discord.ext import commands
 
 from .utils.Errors import NothingPlaying, NotDigit, TooLowVolume, TooHighVolume
 from .utils import Common as common
+from .utils.Outbox import outbox
 
 async def volume(ctx: commands.Context, value: str):
     player: wavelink.Player = common.get_player(ctx)
@@ -32,5 +33,4 @@ async def volume(ctx: commands.Context, value: str):
         await player.set_volume(int(value))
         embed.title = f"Set the volume to {player.volume}%. "
 
-    await ctx.message.reply(embed=embed, delete_after=60, silent=True)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed)
@@ -0,0 +1,216 @@
+import asyncio
+import itertools
+import json
+import typing as t
+
+import discord
+
+from . import Constants as constants
+from .Logger import logger
+
+# Clusters talk to the launcher over newline delimited JSON on a local socket.
+# A request from one cluster is fanned out to every cluster and the answers are
+# returned keyed by cluster id.
+Handler = t.Callable[[], t.Awaitable[t.Any]]
+
+
+def cluster_path(path: str, cluster: int | str | None) -> str:
+    if cluster is None:
+        return path
+    stem, _, suffix = path.partition(".")
+    return f"{stem}.{cluster}.{suffix}" if suffix else f"{stem}.{cluster}"
+
+
+def split_shards(shard_count: int, clusters: int) -> list[list[int]]:
+    clusters = max(1, min(clusters, shard_count))
+    size, extra = divmod(shard_count, clusters)
+    ranges, start = [], 0
+    for i in range(clusters):
+        end = start + size + (i < extra)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+async def recommended_shards(token: str) -> int:
+    http = discord.http.HTTPClient(asyncio.get_running_loop())
+    try:
+        await http.static_login(token)
+        shards, _, _ = await http.get_bot_gateway()
+        return shards
+    finally:
+        await http.close()
+
+
+async def _send(writer: asyncio.StreamWriter, message: dict):
+    writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+    await writer.drain()
+
+
+class ClusterHub:
+    def __init__(self, host: str = constants.CLUSTER_IPC_HOST, port: int = constants.CLUSTER_IPC_PORT):
+        self.host = host
+        self.port = port
+        self._server: asyncio.AbstractServer | None = None
+        self._clusters: dict[int, asyncio.StreamWriter] = {}
+        self._waiting: dict[str, tuple[dict, asyncio.Future]] = {}
+        self._ids = itertools.count()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+
+    async def close(self):
+        for writer in list(self._clusters.values()):
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        cluster = None
+        try:
+            while line := await reader.readline():
+                message = json.loads(line)
+                kind = message["type"]
+                if kind == "hello":
+                    cluster = message["cluster"]
+                    self._clusters[cluster] = writer
+                    logger.info("Cluster connected to hub", extra={"cluster": cluster})
+                elif kind == "request":
+                    asyncio.create_task(self._fan_out(writer, message))
+                elif kind == "response":
+                    waiting = self._waiting.get(message["id"])
+                    if waiting is not None:
+                        answers, done = waiting
+                        answers[message["cluster"]] = message["data"]
+                        if len(answers) >= len(self._clusters) and not done.done():
+                            done.set_result(None)
+        except (ConnectionError, json.JSONDecodeError):
+            pass
+        finally:
+            if cluster is not None and self._clusters.get(cluster) is writer:
+                del self._clusters[cluster]
+                logger.warning("Cluster disconnected from hub", extra={"cluster": cluster})
+            writer.close()
+
+    async def _fan_out(self, origin: asyncio.StreamWriter, request: dict):
+        key = str(next(self._ids))
+        answers: dict[int, t.Any] = {}
+        done = asyncio.get_running_loop().create_future()
+        self._waiting[key] = (answers, done)
+        try:
+            for writer in list(self._clusters.values()):
+                await _send(writer, {"type": "request", "id": key, "op": request["op"]})
+            await asyncio.wait_for(done, timeout=constants.CLUSTER_IPC_TIMEOUT)
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            del self._waiting[key]
+
+        try:
+            await _send(origin, {"type": "response", "id": request["id"], "data": answers})
+        except ConnectionError:
+            pass
+
+
+class ClusterClient:
+    def __init__(self, cluster: int, host: str = constants.CLUSTER_IPC_HOST, port: int = constants.CLUSTER_IPC_PORT):
+        self.cluster = cluster
+        self.host = host
+        self.port = port
+        self.handlers: dict[str, Handler] = {}
+        self._writer: asyncio.StreamWriter | None = None
+        self._task: asyncio.Task | None = None
+        self._waiting: dict[int, asyncio.Future] = {}
+        self._answering: set[asyncio.Task] = set()
+        self._ids = itertools.count()
+
+    async def connect(self):
+        reader = await self._open()
+        self._task = asyncio.create_task(self._run(reader))
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+        for task in self._answering:
+            task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+
+    async def request(self, op: str) -> dict[int, t.Any]:
+        if self._writer is None or self._writer.is_closing():
+            return {self.cluster: await self.handlers[op]()}
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = future
+        try:
+            await _send(self._writer, {"type": "request", "id": request_id, "op": op})
+            answers = await asyncio.wait_for(future, timeout=constants.CLUSTER_IPC_TIMEOUT + 1)
+        except (asyncio.TimeoutError, ConnectionError):
+            logger.warning("Cluster request timed out", extra={"cluster": self.cluster, "op": op})
+            return {self.cluster: await self.handlers[op]()}
+        finally:
+            self._waiting.pop(request_id, None)
+        return {int(cluster): data for cluster, data in answers.items()}
+
+    async def _open(self) -> asyncio.StreamReader:
+        reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        await _send(self._writer, {"type": "hello", "cluster": self.cluster})
+        return reader
+
+    async def _run(self, reader: asyncio.StreamReader):
+        while True:
+            try:
+                await self._listen(reader)
+            except (ConnectionError, json.JSONDecodeError) as err:
+                logger.warning("Cluster hub connection failed", extra={"cluster": self.cluster, "error": repr(err)})
+            self._disconnect()
+            logger.warning("Lost connection to cluster hub", extra={"cluster": self.cluster})
+            reader = await self._reconnect()
+            logger.info("Reconnected to cluster hub", extra={"cluster": self.cluster})
+
+    async def _reconnect(self) -> asyncio.StreamReader:
+        delay = constants.CLUSTER_RECONNECT_DELAY
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                return await self._open()
+            except OSError:
+                self._disconnect()
+                delay = min(delay * 2, constants.CLUSTER_RECONNECT_MAX_DELAY)
+
+    def _disconnect(self):
+        # Requests in flight fall back to a local answer.
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for future in self._waiting.values():
+            if not future.done():
+                future.set_exception(ConnectionError("lost connection to cluster hub"))
+
+    async def _listen(self, reader: asyncio.StreamReader):
+        while line := await reader.readline():
+            message = json.loads(line)
+            if message["type"] == "request":
+                task = asyncio.create_task(self._answer(message))
+                self._answering.add(task)
+                task.add_done_callback(self._answering.discard)
+            elif message["type"] == "response":
+                future = self._waiting.get(message["id"])
+                if future is not None and not future.done():
+                    future.set_result(message["data"])
+
+    async def _answer(self, request: dict):
+        handler = self.handlers.get(request["op"])
+        try:
+            data = await handler() if handler is not None else None
+        except Exception:
+            logger.exception("Cluster request failed", extra={"op": request["op"]})
+            data = None
+        if self._writer is None:
+            return
+        try:
+            await _send(self._writer, {"type": "response", "id": request["id"], "cluster": self.cluster, "data": data})
+        except ConnectionError:
+            logger.warning("Could not answer cluster request", extra={"cluster": self.cluster, "op": request["op"]})
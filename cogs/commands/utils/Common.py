@@ -19,3 +19,6 @@ def format_duration(length):
 
 def format_track_title(track: wavelink.Playable):
     return f"[{track.title}]({track.uri})"
+
+def set_requester(track: wavelink.Playable, user: discord.abc.User):
+    track.extras = {"requester": user.id}
@@ -0,0 +1,149 @@
+import base64
+import struct
+
+import wavelink
+
+
+class _Reader:
+    """Reads the fields of a Lavaplayer encoded track in order."""
+    __slots__ = ("data", "offset")
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+
+    def unpack(self, fmt: str):
+        value, = struct.unpack_from(fmt, self.data, self.offset)
+        self.offset += struct.calcsize(fmt)
+        return value
+
+    def text(self) -> str:
+        size = self.unpack(">H")
+        raw = self.data[self.offset:self.offset + size]
+        self.offset += size
+        # Java writes modified UTF-8, which splits characters outside the BMP
+        # into surrogate pairs.
+        return raw.decode("utf-8", "surrogatepass").encode("utf-16", "surrogatepass").decode("utf-16")
+
+    def optional_text(self) -> str | None:
+        return self.text() if self.unpack(">?") else None
+
+
+def decode_info(encoded: str) -> dict:
+    reader = _Reader(base64.b64decode(encoded))
+    header = reader.unpack(">i")
+    version = reader.unpack(">B") if (header >> 30) & 1 else 1
+
+    title = reader.text()
+    author = reader.text()
+    length = reader.unpack(">q")
+    identifier = reader.text()
+    is_stream = reader.unpack(">?")
+    uri = reader.optional_text() if version >= 2 else None
+    artwork = reader.optional_text() if version >= 3 else None
+    isrc = reader.optional_text() if version >= 3 else None
+    source = reader.text()
+
+    return {
+        "identifier": identifier,
+        "isSeekable": not is_stream,
+        "author": author,
+        "length": length,
+        "isStream": is_stream,
+        "position": 0,
+        "title": title,
+        "uri": uri,
+        "artworkUrl": artwork,
+        "isrc": isrc,
+        "sourceName": source,
+    }
+
+
+class CompactTrack:
+    """Queue entry holding only what the queue renders and the encoded track.
+
+    Everything else, such as artwork and source, is read from the encoded
+    track the first time it is asked for and kept from then on. to_playable
+    builds the full track right before it is played.
+    """
+    __slots__ = ("encoded", "identifier", "title", "author", "uri", "length", "requester", "_info")
+
+    def __init__(self, encoded: str, identifier: str, title: str, author: str, uri: str | None, length: int, requester: int | None = None):
+        self.encoded = encoded
+        self.identifier = identifier
+        self.title = title
+        self.author = author
+        self.uri = uri
+        self.length = length
+        self.requester = requester
+        self._info: dict | None = None
+
+    @classmethod
+    def from_playable(cls, track: "wavelink.Playable | CompactTrack") -> "CompactTrack":
+        if isinstance(track, CompactTrack):
+            return track
+        return cls(
+            track.encoded, track.identifier, track.title, track.author, track.uri, track.length,
+            dict(track.extras).get("requester")
+        )
+
+    @classmethod
+    def from_encoded(cls, encoded: str, requester: int | None = None) -> "CompactTrack":
+        info = decode_info(encoded)
+        return cls(encoded, info["identifier"], info["title"], info["author"], info["uri"], info["length"], requester)
+
+    def __str__(self) -> str:
+        return self.title
+
+    def __repr__(self) -> str:
+        return f"CompactTrack(identifier={self.identifier!r}, title={self.title!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (CompactTrack, wavelink.Playable)):
+            return self.encoded == other.encoded
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.encoded)
+
+    @property
+    def extras(self) -> dict:
+        return {} if self.requester is None else {"requester": self.requester}
+
+    @property
+    def artwork(self) -> str | None:
+        return self.info()["artworkUrl"]
+
+    @property
+    def source(self) -> str:
+        return self.info()["sourceName"]
+
+    @property
+    def is_stream(self) -> bool:
+        return self.info()["isStream"]
+
+    def info(self) -> dict:
+        if self._info is None:
+            self._info = self._decode()
+        return self._info
+
+    def _decode(self) -> dict:
+        try:
+            return decode_info(self.encoded)
+        except (ValueError, struct.error, UnicodeError):
+            return {
+                "identifier": self.identifier,
+                "isSeekable": True,
+                "author": self.author,
+                "length": self.length,
+                "isStream": False,
+                "position": 0,
+                "title": self.title,
+                "uri": self.uri,
+                "artworkUrl": None,
+                "isrc": None,
+                "sourceName": "unknown",
+            }
+
+    def to_playable(self) -> wavelink.Playable:
+        return wavelink.Playable({"encoded": self.encoded, "info": self.info(), "pluginInfo": {}, "userData": self.extras})
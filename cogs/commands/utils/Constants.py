@@ -10,3 +10,91 @@ OPTIONS = {
 
 BONK_IMAGE_URL = "https://external-content.duckduckgo.com/iu/?u=https%3A%2F%2Fi.pinimg.com%2Foriginals%2F17%2F09%2Faf%2F1709af090681fe39335b14b912ea8186.jpg&f=1&nofb=1&ipt=bf5bf1190abaa37c6585b4566656f36a62be067c5e0a37efa2167975197d02b2&ipo=images"
 
+SEARCH_CACHE_PATH = "search_cache.db"
+SEARCH_CACHE_TTL = 60 * 60 * 24 * 3
+SEARCH_CACHE_CAPACITY = 5000
+SEARCH_CACHE_MEMORY_CAPACITY = 500
+SEARCH_CACHE_TRIM_INTERVAL = 50
+
+NODE_CHECK_INTERVAL = 10
+
+PLAYLIST_CHUNK_SIZE = 100
+MULTI_QUERY_LIMIT = 25
+MULTI_QUERY_CONCURRENCY = 4
+
+QUEUE_PAGE_SIZE = 20
+QUEUE_VIEW_TIMEOUT = 120
+SEARCH_VIEW_TIMEOUT = 60
+
+LOG_PATH = "labbebot.log"
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+HISTORY_PATH = "history.db"
+HISTORY_FLUSH_INTERVAL = 15
+HISTORY_PENDING_LIMIT = 50000
+TOP_TRACKS_MAX = 25
+
+PREFETCH_DEPTH = 5
+PREFETCH_CONCURRENCY = 4
+PREFETCH_TIMEOUT = 5
+PREFETCH_CACHE_SIZE = 2000
+
+EMBED_TOTAL_LIMIT = 6000
+EMBED_FIELD_LIMIT = 25
+EMBED_FIELD_NAME_LIMIT = 256
+EMBED_FIELD_VALUE_LIMIT = 1024
+TRACK_LINE_CACHE_SIZE = 5000
+
+NOW_PLAYING_EDIT_INTERVAL = 5
+NOW_PLAYING_PROGRESS_INTERVAL = 30
+NOW_PLAYING_END_GRACE = 10
+
+REPLY_DELETE_AFTER = 60
+COMMAND_DELETE_DELAY = 2
+OUTBOX_RESOLUTION = 1
+OUTBOX_SLOTS = 1024
+
+SNAPSHOT_PATH = "players.snapshot.gz"
+SNAPSHOT_MAX_AGE = 60 * 15
+
+METRICS_HOST = "127.0.0.1"
+LOOP_LAG_INTERVAL = 1
+
+SLOW_COMMAND_THRESHOLD = 1.0
+SLOW_LOG_PATH = "slow.log"
+TRACE_BUFFER_SIZE = 200
+PROFILE_DUMP_LINES = 40
+
+CLUSTER_IPC_HOST = "127.0.0.1"
+CLUSTER_IPC_PORT = 47001
+CLUSTER_IPC_TIMEOUT = 5
+CLUSTER_CHECK_INTERVAL = 5
+CLUSTER_RESTART_DELAY = 10
+CLUSTER_RECONNECT_DELAY = 1
+CLUSTER_RECONNECT_MAX_DELAY = 60
+
+EMPTY_CHANNEL_GRACE = 60
+
+IDLE_TIMEOUT = 60 * 10
+REAPER_INTERVAL = 60
+AUTO_QUEUE_LIMIT = 50
+PLAYER_HISTORY_LIMIT = 100
+TRACK_OVERHEAD = 2600
+COMPACT_TRACK_OVERHEAD = 500
+MEMORY_TOP_GUILDS = 10
+
+TRACK_INDEX_PATH = "track_index.db"
+TRACK_INDEX_CAPACITY = 20000
+TRACK_INDEX_THRESHOLD = 0.5
+TRACK_INDEX_MATCH = 0.9
+TRACK_INDEX_MARGIN = 0.05
+TRACK_INDEX_SUGGESTIONS = 3
+
+RECOMMEND_WINDOW = 5
+RECOMMEND_EXCLUDE = 50
+RECOMMEND_AHEAD = 3
+RECOMMEND_CAPACITY = 5000
+RECOMMEND_ROW_SIZE = 200
+RECOMMEND_SESSION_GAP = 60 * 30
+RECOMMEND_HISTORY_ROWS = 100000
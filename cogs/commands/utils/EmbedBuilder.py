@@ -0,0 +1,80 @@
+import typing as t
+from collections import OrderedDict
+
+import discord
+import wavelink
+
+from . import Constants as constants
+from . import Common as common
+
+_lines: OrderedDict[tuple[str, str, int], str] = OrderedDict()
+
+
+def track_line(track: wavelink.Playable) -> str:
+    key = (track.identifier, track.title, track.length)
+    line = _lines.get(key)
+    if line is None:
+        line = f"{common.format_track_title(track)} ({common.format_duration(track.length)})"
+        _lines[key] = line
+        if len(_lines) > constants.TRACK_LINE_CACHE_SIZE:
+            _lines.popitem(last=False)
+    else:
+        _lines.move_to_end(key)
+    return line
+
+
+class EmbedBuilder:
+    def __init__(self, embed: discord.Embed):
+        self.embed = embed
+        self.size = len(embed)
+
+    @property
+    def remaining(self) -> int:
+        return constants.EMBED_TOTAL_LIMIT - self.size
+
+    def fits(self, name: str, value: str) -> bool:
+        return (
+            len(self.embed.fields) < constants.EMBED_FIELD_LIMIT
+            and len(name) <= constants.EMBED_FIELD_NAME_LIMIT
+            and len(value) <= constants.EMBED_FIELD_VALUE_LIMIT
+            and len(name) + len(value) <= self.remaining
+        )
+
+    def add_field(self, name: str, value: str, inline: bool = False) -> bool:
+        if not self.fits(name, value):
+            return False
+        self.embed.add_field(name=name, value=value, inline=inline)
+        self.size += len(name) + len(value)
+        return True
+
+    def add_lines(self, name: str, lines: t.Iterable[str], more_name: str = "More", max_fields: int | None = None, reserve: int = 0) -> int:
+        added = 0
+        pending = 0
+        fields = 0
+        value = ""
+
+        for line in lines:
+            line = line[:constants.EMBED_FIELD_VALUE_LIMIT - 1] + "\n"
+
+            if len(value) + len(line) > constants.EMBED_FIELD_VALUE_LIMIT:
+                if max_fields is not None and fields + 1 >= max_fields:
+                    break
+                if not self.add_field(name, value):
+                    return added
+                added += pending
+                fields += 1
+                pending = 0
+                value = ""
+                name = more_name
+
+            if len(self.embed.fields) >= constants.EMBED_FIELD_LIMIT:
+                break
+            if len(name) + len(value) + len(line) > self.remaining - reserve:
+                break
+
+            value += line
+            pending += 1
+
+        if value and self.add_field(name, value):
+            added += pending
+        return added
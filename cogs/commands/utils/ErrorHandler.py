@@ -2,6 +2,10 @@ from discord.ext import commands
 import discord
 import datetime as dt
 from .Errors import *
+from . import Constants as constants
+from .Outbox import outbox
+from . import Logger as log
+from .Logger import logger
 
 async def print_error_message(ctx: commands.Context, err: commands.CommandError):
     embed = discord.Embed(
@@ -38,11 +42,13 @@ async def print_error_message(ctx: commands.Context, err: commands.CommandError)
         embed.title = "Too short value. "
     elif isinstance(err, InvalidPosition):
         embed.title = "Value is too high for song. "
+    elif isinstance(err, NoHistory):
+        embed.title = "Nothing has been played here yet. "
+    elif isinstance(err, TooManyQueries):
+        embed.title = f"You can queue at most {constants.MULTI_QUERY_LIMIT} songs at once. "
     else:
         embed.title = "Unexpected error. "
 
-    print(f"{dt.datetime.now()} | {ctx.guild.name:15} | {ctx.author.nick:20} tried {ctx.message.content:30} and failed with: {embed.title}")
-    print(err)
+    logger.warning("Command failed", extra=log.fields(ctx, command=ctx.message.content, reason=embed.title, error=repr(err)))
 
-    await ctx.message.reply(embed=embed, delete_after=60, silent=True)
-    await ctx.message.delete()
+    await outbox.reply(ctx, embed=embed)
@@ -58,3 +58,11 @@ class TooShort(commands.CommandError):
 
 class InvalidPosition(commands.CommandError):
     pass
+
+
+class NoHistory(commands.CommandError):
+    pass
+
+
+class TooManyQueries(commands.CommandError):
+    pass
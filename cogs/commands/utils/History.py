@@ -0,0 +1,182 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+import wavelink
+
+from . import Constants as constants
+from .Logger import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plays (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    guild_id INTEGER NOT NULL,
+    user_id INTEGER,
+    event TEXT NOT NULL,
+    track_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    uri TEXT,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS plays_guild_time ON plays (guild_id, time);
+CREATE INDEX IF NOT EXISTS plays_track ON plays (track_id);
+
+CREATE TABLE IF NOT EXISTS track_stats (
+    guild_id INTEGER NOT NULL,
+    track_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    uri TEXT,
+    queued INTEGER NOT NULL DEFAULT 0,
+    started INTEGER NOT NULL DEFAULT 0,
+    last_played REAL NOT NULL,
+    PRIMARY KEY (guild_id, track_id)
+);
+CREATE INDEX IF NOT EXISTS track_stats_top ON track_stats (guild_id, started DESC, queued DESC);
+
+CREATE TABLE IF NOT EXISTS user_stats (
+    guild_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    queued INTEGER NOT NULL DEFAULT 0,
+    started INTEGER NOT NULL DEFAULT 0,
+    played_ms INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS guild_stats (
+    guild_id INTEGER PRIMARY KEY,
+    queued INTEGER NOT NULL DEFAULT 0,
+    started INTEGER NOT NULL DEFAULT 0,
+    played_ms INTEGER NOT NULL DEFAULT 0,
+    tracks INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def requester(track: wavelink.Playable) -> int | None:
+    return dict(track.extras).get("requester")
+
+
+class History:
+    def __init__(self, path: str):
+        self.path = path
+        self._pending: list[tuple] = []
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(SCHEMA)
+        return self._db
+
+    def record(self, event: str, guild_id: int, user_id: int | None, track: wavelink.Playable):
+        self._pending.append((time.time(), guild_id, user_id, event, track.identifier, track.title, track.author, track.uri, track.length))
+
+    def record_many(self, event: str, guild_id: int, user_id: int | None, tracks: list[wavelink.Playable]):
+        now = time.time()
+        self._pending.extend(
+            (now, guild_id, user_id, event, t.identifier, t.title, t.author, t.uri, t.length) for t in tracks
+        )
+
+    async def flush(self):
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        try:
+            await asyncio.to_thread(self._write, rows)
+        except Exception:
+            logger.exception("Failed to write play history", extra={"rows": len(rows)})
+            self._pending[:0] = rows
+            dropped = len(self._pending) - constants.HISTORY_PENDING_LIMIT
+            if dropped > 0:
+                del self._pending[:dropped]
+                logger.warning("Dropped unwritten play history", extra={"rows": dropped})
+
+    async def query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        return await asyncio.to_thread(self._read, sql, params)
+
+    async def close(self):
+        await self.flush()
+        await asyncio.to_thread(self._close)
+
+    def _close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _read(self, sql: str, params: tuple) -> list[tuple]:
+        with self._lock:
+            return self.db.execute(sql, params).fetchall()
+
+    def _write(self, rows: list[tuple]):
+        tracks: dict[tuple, list] = {}
+        users: dict[tuple, list] = defaultdict(lambda: [0, 0, 0])
+        guilds: dict[int, list] = defaultdict(lambda: [0, 0, 0])
+
+        for played, guild_id, user_id, event, track_id, title, author, uri, length in rows:
+            queued = event == "queued"
+            started = event == "started"
+
+            stats = tracks.setdefault((guild_id, track_id), [title, author, uri, 0, 0, played])
+            stats[3] += queued
+            stats[4] += started
+            stats[5] = max(stats[5], played)
+
+            guilds[guild_id][0] += queued
+            guilds[guild_id][1] += started
+            guilds[guild_id][2] += length if started else 0
+
+            if user_id is not None:
+                users[(guild_id, user_id)][0] += queued
+                users[(guild_id, user_id)][1] += started
+                users[(guild_id, user_id)][2] += length if started else 0
+
+        with self._lock, self.db:
+            new_tracks = defaultdict(int)
+            for guild_id, track_id in tracks:
+                exists = self.db.execute(
+                    "SELECT 1 FROM track_stats WHERE guild_id = ? AND track_id = ?", (guild_id, track_id)
+                ).fetchone()
+                if exists is None:
+                    new_tracks[guild_id] += 1
+
+            self.db.executemany(
+                "INSERT INTO plays (time, guild_id, user_id, event, track_id, title, author, uri, length) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self.db.executemany(
+                "INSERT INTO track_stats (guild_id, track_id, title, author, uri, queued, started, last_played) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (guild_id, track_id) DO UPDATE SET "
+                "title = excluded.title, author = excluded.author, uri = excluded.uri, "
+                "queued = queued + excluded.queued, started = started + excluded.started, "
+                "last_played = MAX(last_played, excluded.last_played)",
+                [(guild_id, track_id, *stats) for (guild_id, track_id), stats in tracks.items()]
+            )
+            self.db.executemany(
+                "INSERT INTO user_stats (guild_id, user_id, queued, started, played_ms) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (guild_id, user_id) DO UPDATE SET "
+                "queued = queued + excluded.queued, started = started + excluded.started, "
+                "played_ms = played_ms + excluded.played_ms",
+                [(guild_id, user_id, *stats) for (guild_id, user_id), stats in users.items()]
+            )
+            self.db.executemany(
+                "INSERT INTO guild_stats (guild_id, queued, started, played_ms, tracks) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (guild_id) DO UPDATE SET "
+                "queued = queued + excluded.queued, started = started + excluded.started, "
+                "played_ms = played_ms + excluded.played_ms, tracks = tracks + excluded.tracks",
+                [(guild_id, *stats, new_tracks[guild_id]) for guild_id, stats in guilds.items()]
+            )
+
+
+history = History(constants.HISTORY_PATH)
@@ -0,0 +1,106 @@
+import copy
+import datetime as dt
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+import wavelink
+from discord.ext import commands
+
+from . import Constants as constants
+
+logger = logging.getLogger("labbebot")
+
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+_listener: logging.handlers.QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": dt.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exception = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+            record.exc_text = None
+        return record
+
+
+def setup(level: str = "INFO", path: str | None = constants.LOG_PATH, slow_path: str | None = constants.SLOW_LOG_PATH):
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = JsonFormatter()
+    handlers: list[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if path:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=constants.LOG_MAX_BYTES,
+            backupCount=constants.LOG_BACKUP_COUNT,
+            encoding="utf-8"
+        ))
+    if slow_path:
+        slow_handler = logging.handlers.RotatingFileHandler(
+            slow_path,
+            maxBytes=constants.LOG_MAX_BYTES,
+            backupCount=constants.LOG_BACKUP_COUNT,
+            encoding="utf-8"
+        )
+        slow_handler.addFilter(logging.Filter("labbebot.slow"))
+        handlers.append(slow_handler)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(logging.WARNING)
+    logger.setLevel(level.upper())
+    logging.getLogger("discord").setLevel(logging.INFO)
+    logging.getLogger("wavelink").setLevel(logging.INFO)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def fields(ctx: commands.Context | None = None, track: wavelink.Playable | None = None, **kwargs) -> dict:
+    extra = {}
+    if ctx is not None:
+        if ctx.guild is not None:
+            extra["guild"] = ctx.guild.name
+            extra["guild_id"] = ctx.guild.id
+        extra["user"] = ctx.author.display_name
+        extra["user_id"] = ctx.author.id
+    if track is not None:
+        extra["track"] = track.title
+        extra["track_author"] = track.author
+        extra["track_id"] = track.identifier
+    extra.update(kwargs)
+    return extra
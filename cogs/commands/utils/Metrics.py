@@ -0,0 +1,199 @@
+import asyncio
+import bisect
+import math
+import time
+
+import discord
+import wavelink
+from aiohttp import web
+
+from . import Constants as constants
+from . import Nodes as nodes
+from .Logger import logger
+from .Player import Player
+
+# Minimal Prometheus text exposition, so the bot does not need another dependency
+# for a handful of counters, gauges and histograms.
+registry: list["Metric"] = []
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QUEUE_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000)
+MEMORY_BUCKETS = (10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(name: str, labelnames: tuple[str, ...], labels: tuple, value: float, extra: str = "") -> str:
+    pairs = [f'{k}="{_escape(v)}"' for k, v in zip(labelnames, labels)]
+    if extra:
+        pairs.append(extra)
+    label_text = "{" + ",".join(pairs) + "}" if pairs else ""
+    return f"{name}{label_text} {value}"
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        registry.append(self)
+
+    def expose(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def expose(self) -> list[str]:
+        lines = super().expose()
+        lines.extend(_format(self.name, self.labelnames, labels, value) for labels, value in self._values.items())
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *labels, value: float):
+        self._values[labels] = value
+
+    def clear(self):
+        self._values.clear()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+        self._counts: dict[tuple, list[int]] = {}
+        self._sums: dict[tuple, float] = {}
+
+    def observe(self, *labels, value: float):
+        counts = self._counts.get(labels)
+        if counts is None:
+            counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+            self._sums[labels] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    def clear(self):
+        self._counts.clear()
+        self._sums.clear()
+
+    def expose(self) -> list[str]:
+        lines = super().expose()
+        for labels, counts in self._counts.items():
+            total = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                total += count
+                lines.append(_format(f"{self.name}_bucket", self.labelnames, labels, total, f'le="{bound}"'))
+            lines.append(_format(f"{self.name}_sum", self.labelnames, labels, self._sums[labels]))
+            lines.append(_format(f"{self.name}_count", self.labelnames, labels, total))
+        return lines
+
+
+command_total = Counter("labbebot_command_total", "Music commands invoked.", ("command", "status"))
+command_duration = Histogram("labbebot_command_duration_seconds", "Music command latency.", ("command",))
+search_total = Counter("labbebot_search_total", "Track searches by outcome: local, cached, found, empty or error.", ("result",))
+search_duration = Histogram("labbebot_search_duration_seconds", "Latency of Lavalink track searches.")
+players = Gauge("labbebot_players", "Connected players.")
+playing = Gauge("labbebot_players_playing", "Players currently playing.")
+queue_length = Histogram("labbebot_queue_length", "Tracks queued per player at scrape time; the sum is all queued tracks.", buckets=QUEUE_BUCKETS)
+node_up = Gauge("labbebot_node_up", "Whether a Lavalink node is connected.", ("node",))
+node_players = Gauge("labbebot_node_players", "Players reported by a Lavalink node.", ("node",))
+node_playing = Gauge("labbebot_node_playing_players", "Playing players reported by a Lavalink node.", ("node",))
+node_cpu = Gauge("labbebot_node_cpu_load", "System CPU load reported by a Lavalink node.", ("node",))
+node_deficit = Gauge("labbebot_node_frames_deficit", "Audio frame deficit reported by a Lavalink node.", ("node",))
+node_nulled = Gauge("labbebot_node_frames_nulled", "Nulled audio frames reported by a Lavalink node.", ("node",))
+node_penalty = Gauge("labbebot_node_penalty", "Placement penalty of a Lavalink node.", ("node",))
+player_tracks = Gauge("labbebot_player_tracks", "Tracks held by all players in queue, history and auto_queue.", ("queue",))
+player_memory = Histogram("labbebot_player_memory_bytes", "Estimated memory held by the tracks of each player at scrape time.", buckets=MEMORY_BUCKETS)
+gateway_latency = Gauge("labbebot_gateway_latency_seconds", "Discord gateway heartbeat latency.")
+loop_lag = Histogram("labbebot_event_loop_lag_seconds", "Event loop scheduling delay.", buckets=LAG_BUCKETS)
+
+
+def collect(bot: discord.Client):
+    voice_players = [p for p in bot.voice_clients if isinstance(p, wavelink.Player)]
+    players.set(value=len(voice_players))
+    playing.set(value=sum(p.playing for p in voice_players))
+
+    queue_length.clear()
+    player_memory.clear()
+    tracks = dict.fromkeys(("queue", "history", "auto_queue", "auto_history"), 0)
+    for player in voice_players:
+        queue_length.observe(value=len(player.queue))
+        if isinstance(player, Player):
+            usage = player.footprint()
+            for name in tracks:
+                tracks[name] += usage[name]
+            player_memory.observe(value=usage["bytes"])
+    for name, count in tracks.items():
+        player_tracks.set(name, value=count)
+
+    for node in wavelink.Pool.nodes.values():
+        node_up.set(node.identifier, value=int(node.status is wavelink.NodeStatus.CONNECTED))
+        node_penalty.set(node.identifier, value=nodes.penalty(node))
+        node_stats = nodes.stats.get(node.identifier)
+        if node_stats is None:
+            continue
+        node_players.set(node.identifier, value=node_stats.players)
+        node_playing.set(node.identifier, value=node_stats.playing)
+        node_cpu.set(node.identifier, value=node_stats.cpu.system_load)
+        if node_stats.frames is not None:
+            node_deficit.set(node.identifier, value=node_stats.frames.deficit)
+            node_nulled.set(node.identifier, value=node_stats.frames.nulled)
+
+    if math.isfinite(bot.latency):
+        gateway_latency.set(value=bot.latency)
+
+
+def render(bot: discord.Client) -> str:
+    collect(bot)
+    return "\n".join(line for metric in registry for line in metric.expose()) + "\n"
+
+
+class MetricsServer:
+    def __init__(self, bot: discord.Client, host: str, port: int):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self._runner: web.AppRunner | None = None
+        self._lag_task: asyncio.Task | None = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self._lag_task = asyncio.create_task(self._measure_lag())
+        logger.info("Serving metrics", extra={"host": self.host, "port": self.port})
+
+    async def close(self):
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        return web.Response(text=render(self.bot), content_type="text/plain")
+
+    async def _measure_lag(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(constants.LOOP_LAG_INTERVAL)
+            loop_lag.observe(value=max(0.0, time.perf_counter() - start - constants.LOOP_LAG_INTERVAL))
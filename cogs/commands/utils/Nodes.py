@@ -0,0 +1,83 @@
+import wavelink
+import discord
+
+from .Logger import logger
+
+stats: dict[str, wavelink.StatsResponsePayload] = {}
+
+
+def build_nodes(addresses: str, password: str) -> list[wavelink.Node]:
+    return [
+        wavelink.Node(identifier=f"node-{i}", uri=address.strip(), password=password)
+        for i, address in enumerate(addresses.split(","))
+        if address.strip()
+    ]
+
+
+def connected_nodes() -> list[wavelink.Node]:
+    return [n for n in wavelink.Pool.nodes.values() if n.status is wavelink.NodeStatus.CONNECTED]
+
+
+def penalty(node: wavelink.Node) -> float:
+    score = len(node.players)
+
+    node_stats = stats.get(node.identifier)
+    if node_stats is None:
+        return score
+
+    score += 1.05 ** (100 * node_stats.cpu.system_load) * 10 - 10
+    if node_stats.frames is not None:
+        score += 1.03 ** (500 * node_stats.frames.deficit / 3000) * 600 - 600
+        score += (1.03 ** (500 * node_stats.frames.nulled / 3000) * 300 - 300) * 2
+    return score
+
+
+def best_node(exclude: wavelink.Node | None = None) -> wavelink.Node:
+    nodes = [n for n in connected_nodes() if n != exclude]
+    if not nodes:
+        raise wavelink.InvalidNodeException("No nodes are currently assigned to the wavelink.Pool in a CONNECTED state.")
+    return min(nodes, key=penalty)
+
+
+async def refresh_stats():
+    for node in wavelink.Pool.nodes.values():
+        if node.status is not wavelink.NodeStatus.CONNECTED:
+            stats.pop(node.identifier, None)
+            continue
+        try:
+            stats[node.identifier] = await node.fetch_stats()
+        except Exception:
+            stats.pop(node.identifier, None)
+
+
+async def migrate(player: wavelink.Player, node: wavelink.Node):
+    current = player.current
+    position = player.position
+    paused = player.paused
+    volume = player.volume
+
+    player.node._players.pop(player.guild.id, None)
+    player._node = node
+    node._players[player.guild.id] = player
+    await player._dispatch_voice_update()
+
+    if current is not None:
+        await player.play(current, start=min(position, current.length), paused=paused, volume=volume, add_history=False)
+
+
+async def failover(bot: discord.Client):
+    for player in bot.voice_clients:
+        if not isinstance(player, wavelink.Player):
+            continue
+        if player.node.status is wavelink.NodeStatus.CONNECTED:
+            continue
+        try:
+            node = best_node(exclude=player.node)
+        except wavelink.InvalidNodeException:
+            return
+        old = player.node
+        try:
+            await migrate(player, node)
+            logger.warning("Moved player to another node", extra={"guild_id": player.guild.id, "from_node": old.identifier, "to_node": node.identifier})
+        except Exception:
+            logger.exception("Failed to move player to another node", extra={"guild_id": player.guild.id, "to_node": node.identifier})
@@ -0,0 +1,112 @@
+import asyncio
+import datetime as dt
+import time
+
+import discord
+import wavelink
+
+from . import Constants as constants
+from . import Common as common
+from . import Prefetch as prefetch
+from .EmbedBuilder import track_line
+from .Logger import logger
+
+_deleting: set[asyncio.Task] = set()
+
+
+class NowPlayingMessage:
+    def __init__(self, player: wavelink.Player):
+        self.player = player
+        self.message: discord.Message | None = None
+        self._dirty = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._last_edit = 0.0
+
+    def update(self):
+        self._dirty.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.message is not None:
+            message, self.message = self.message, None
+            task = asyncio.create_task(self._delete(message))
+            _deleting.add(task)
+            task.add_done_callback(_deleting.discard)
+
+    def build_embed(self) -> discord.Embed | None:
+        track = self.player.current
+        if track is None:
+            return None
+
+        embed = discord.Embed(
+            timestamp=dt.datetime.now(),
+            colour=discord.Colour.from_rgb(209, 112, 2)
+        )
+        embed.set_author(name="Now playing")
+        embed.description = f":notes: {track_line(track)}"
+        if constants.NOW_PLAYING_PROGRESS_INTERVAL and not track.is_stream:
+            embed.description += f"\n{common.format_duration(self.player.position)}/{common.format_duration(track.length)}"
+        embed.set_footer(text=track.author, icon_url=constants.BONK_IMAGE_URL)
+
+        thumbnail = prefetch.artwork(track)
+        if thumbnail:
+            embed.set_thumbnail(url=thumbnail)
+
+        return embed
+
+    async def _run(self):
+        progress = constants.NOW_PLAYING_PROGRESS_INTERVAL or None
+        while self.player.connected:
+            try:
+                await asyncio.wait_for(self._dirty.wait(), timeout=progress)
+            except asyncio.TimeoutError:
+                if not self.player.playing or self.player.paused:
+                    continue
+
+            wait = self._last_edit + constants.NOW_PLAYING_EDIT_INTERVAL - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            self._dirty.clear()
+            embed = self.build_embed()
+            if embed is None:
+                await self._finish()
+                continue
+
+            try:
+                await self._send(embed)
+            except discord.HTTPException:
+                logger.exception("Failed to update now playing message", extra={"guild_id": self.player.guild.id})
+            self._last_edit = time.monotonic()
+
+    async def _finish(self):
+        # Nothing is current between two tracks either, so give the next one
+        # a moment to start before treating playback as over.
+        try:
+            await asyncio.wait_for(self._dirty.wait(), timeout=constants.NOW_PLAYING_END_GRACE)
+            return
+        except asyncio.TimeoutError:
+            pass
+        if self.player.current is None and self.message is not None:
+            message, self.message = self.message, None
+            await self._delete(message)
+
+    async def _send(self, embed: discord.Embed):
+        if self.message is not None:
+            try:
+                await self.message.edit(embed=embed)
+                return
+            except discord.NotFound:
+                self.message = None
+
+        self.message = await self.player.text_channel.send(embed=embed, silent=True)
+
+    async def _delete(self, message: discord.Message):
+        try:
+            await message.delete()
+        except discord.HTTPException:
+            pass
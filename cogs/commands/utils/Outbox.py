@@ -0,0 +1,108 @@
+import asyncio
+import math
+import time
+
+import discord
+from discord.ext import commands
+
+from . import Constants as constants
+from .Logger import logger
+
+
+class Outbox:
+    def __init__(self, resolution: float, slots: int):
+        self.resolution = resolution
+        self._wheel: list[list[tuple[int, discord.Message]]] = [[] for _ in range(slots)]
+        self._origin = time.monotonic()
+        self._processed = 0
+        self._pending = 0
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def reply(self, ctx: commands.Context, *, delete_after: float | None = constants.REPLY_DELETE_AFTER, **kwargs) -> discord.Message:
+        kwargs.setdefault("silent", True)
+        message = await ctx.message.reply(**kwargs)
+        if delete_after is not None:
+            self.delete_later(message, delete_after)
+        self.delete_later(ctx.message)
+        return message
+
+    def delete_later(self, message: discord.Message, delay: float = constants.COMMAND_DELETE_DELAY):
+        if self._pending == 0:
+            self._processed = self._now()
+        deadline = self._now() + max(1, math.ceil(delay / self.resolution))
+        self._wheel[deadline % len(self._wheel)].append((deadline, message))
+        self._pending += 1
+        self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def flush(self):
+        due = [message for slot in self._wheel for _, message in slot]
+        for slot in self._wheel:
+            slot.clear()
+        self._pending = 0
+        await self._delete(due)
+
+    def _now(self) -> int:
+        return int((time.monotonic() - self._origin) / self.resolution)
+
+    def _collect(self, now: int) -> list[discord.Message]:
+        due = []
+        ticks = range(self._processed + 1, now + 1)
+        if len(ticks) > len(self._wheel):
+            ticks = range(len(self._wheel))
+        for tick in ticks:
+            slot = self._wheel[tick % len(self._wheel)]
+            if not slot:
+                continue
+            keep = []
+            for entry in slot:
+                (due if entry[0] <= now else keep).append(entry)
+            slot[:] = keep
+        self._processed = now
+        self._pending -= len(due)
+        return [message for _, message in due]
+
+    async def _run(self):
+        while True:
+            if self._pending == 0:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            next_tick = (self._now() + 1) * self.resolution + self._origin
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+
+            due = self._collect(self._now())
+            if due:
+                await self._delete(due)
+
+    async def _delete(self, messages: list[discord.Message]):
+        channels: dict[int, tuple[discord.abc.Messageable, dict[int, discord.Message]]] = {}
+        for message in messages:
+            channels.setdefault(message.channel.id, (message.channel, {}))[1][message.id] = message
+
+        for channel, unique in channels.values():
+            batch = list(unique.values())
+            for i in range(0, len(batch), 100):
+                chunk = batch[i:i + 100]
+                try:
+                    await channel.delete_messages(chunk)
+                except (discord.HTTPException, discord.ClientException, AttributeError):
+                    await self._delete_each(chunk)
+
+    async def _delete_each(self, messages: list[discord.Message]):
+        for message in messages:
+            try:
+                await message.delete()
+            except discord.NotFound:
+                pass
+            except discord.HTTPException:
+                logger.warning("Failed to delete message", extra={"channel_id": message.channel.id, "message_id": message.id})
+
+
+outbox = Outbox(constants.OUTBOX_RESOLUTION, constants.OUTBOX_SLOTS)
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import discord
+import wavelink
+from discord.utils import MISSING
+
+from . import Constants as constants
+from . import Prefetch as prefetch
+from .CompactTrack import CompactTrack
+from .Nodes import best_node
+from .NowPlayingMessage import NowPlayingMessage
+from .TrackIndex import track_index
+from .TrackQueue import TrackQueue
+
+
+class Player(wavelink.Player):
+    text_channel: discord.abc.Messageable
+
+    def __init__(self, client: discord.Client = MISSING, channel: discord.abc.Connectable = MISSING, *, nodes: list[wavelink.Node] | None = None):
+        super().__init__(client, channel, nodes=nodes or [best_node()])
+        self.queue: TrackQueue = TrackQueue()
+        self._ingest_tasks: set[asyncio.Task] = set()
+        self.now_playing_message = NowPlayingMessage(self)
+        self.last_active = time.monotonic()
+        self._footprint: tuple[tuple, dict[str, int]] | None = None
+
+    def cleanup(self):
+        self.now_playing_message.close()
+        super().cleanup()
+
+    async def teardown(self):
+        await self.disconnect()
+        self.cancel_ingest()
+        self.cleanup()
+        self.queue.reset()
+        self.auto_queue.reset()
+        if self.playing:
+            await self.stop()
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    @property
+    def idle(self) -> float:
+        if self.playing and not self.paused:
+            return 0.0
+        return time.monotonic() - self.last_active
+
+    def trim(self) -> int:
+        removed = 0
+        excess = len(self.auto_queue) - constants.AUTO_QUEUE_LIMIT
+        if excess > 0:
+            del self.auto_queue[-excess:]
+            removed += excess
+
+        # Loop all replays the queue from its history, so that one is left alone.
+        histories = [self.auto_queue.history]
+        if self.queue.mode is not wavelink.QueueMode.loop_all:
+            histories.append(self.queue.history)
+        for history in histories:
+            excess = len(history) - constants.PLAYER_HISTORY_LIMIT
+            if excess > 0:
+                del history[:excess]
+                removed += excess
+        return removed
+
+    def footprint(self) -> dict[str, int]:
+        queues = {
+            "queue": self.queue,
+            "history": self.queue.history,
+            "auto_queue": self.auto_queue,
+            "auto_history": self.auto_queue.history,
+        }
+        key = (self.queue.version, *(len(q) for q in queues.values()))
+        if self._footprint is not None and self._footprint[0] == key:
+            return self._footprint[1]
+
+        usage = {name: len(q) for name, q in queues.items()}
+        usage["bytes"] = sum(track_bytes(track) for q in queues.values() for track in q)
+        self._footprint = (key, usage)
+        return usage
+
+    def enqueue_in_background(self, tracks: list[wavelink.Playable], index: bool = True) -> asyncio.Task:
+        task = asyncio.create_task(self._ingest(tracks, index))
+        self._ingest_tasks.add(task)
+        task.add_done_callback(self._ingest_tasks.discard)
+        return task
+
+    def cancel_ingest(self):
+        for task in self._ingest_tasks:
+            task.cancel()
+        self._ingest_tasks.clear()
+
+    async def _do_recommendation(self, *, populate_track: wavelink.Playable | None = None, max_population: int | None = None):
+        # Local recommendations sit at the front of the auto_queue, play them
+        # without asking the node for more.
+        if populate_track is None and self.auto_queue and dict(self.auto_queue[0].extras).get("recommended"):
+            self._inactivity_start()
+            track = self.auto_queue.get()
+            self.auto_queue.history.put(track)
+            await self.play(track, add_history=False)
+            return
+        await super()._do_recommendation(populate_track=populate_track, max_population=max_population)
+
+    async def _ingest(self, tracks: list[wavelink.Playable], index: bool = True):
+        async with self.queue._lock:
+            for i in range(0, len(tracks), constants.PLAYLIST_CHUNK_SIZE):
+                chunk = tracks[i:i + constants.PLAYLIST_CHUNK_SIZE]
+                self.queue.put(chunk)
+                if i == 0:
+                    # Index only the head of a playlist, the rest is indexed
+                    # as it plays instead of churning the whole index at once.
+                    if index:
+                        track_index.add_many(chunk)
+                    prefetch.look_ahead(self)
+                await asyncio.sleep(0)
+
+
+def track_bytes(track: wavelink.Playable | CompactTrack) -> int:
+    overhead = constants.COMPACT_TRACK_OVERHEAD if isinstance(track, CompactTrack) else constants.TRACK_OVERHEAD
+    return overhead + len(track.encoded) + len(track.title) + len(track.author) + len(track.uri or "")
@@ -0,0 +1,79 @@
+import asyncio
+from collections import OrderedDict
+
+import aiohttp
+import wavelink
+
+from . import Constants as constants
+from .Logger import logger
+
+_artwork: OrderedDict[str, str | None] = OrderedDict()
+_pending: dict[str, asyncio.Task] = {}
+_session: aiohttp.ClientSession | None = None
+_semaphore = asyncio.Semaphore(constants.PREFETCH_CONCURRENCY)
+
+
+def artwork(track: wavelink.Playable) -> str | None:
+    if track.identifier in _artwork:
+        return _artwork[track.identifier]
+    return track.artwork
+
+
+def look_ahead(player: wavelink.Player):
+    upcoming = []
+    if player.current is not None:
+        upcoming.append(player.current)
+    for i, track in enumerate(player.queue):
+        if i == constants.PREFETCH_DEPTH:
+            break
+        upcoming.append(track)
+
+    for track in upcoming:
+        if track.identifier in _artwork or track.identifier in _pending:
+            continue
+        task = asyncio.create_task(_resolve(track))
+        _pending[track.identifier] = task
+        task.add_done_callback(lambda _, key=track.identifier: _pending.pop(key, None))
+
+
+async def close():
+    global _session
+    for task in list(_pending.values()):
+        task.cancel()
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+
+def _candidates(track: wavelink.Playable) -> list[str]:
+    urls = [track.artwork] if track.artwork else []
+    if track.source == "youtube":
+        urls.append(f"https://i.ytimg.com/vi/{track.identifier}/hqdefault.jpg")
+    return urls
+
+
+async def _reachable(url: str) -> bool:
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=constants.PREFETCH_TIMEOUT))
+    async with _semaphore:
+        try:
+            async with _session.head(url, allow_redirects=True) as resp:
+                return resp.status < 400
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+
+async def _resolve(track: wavelink.Playable):
+    resolved = None
+    for url in _candidates(track):
+        if await _reachable(url):
+            resolved = url
+            break
+
+    if resolved is None:
+        logger.debug("No artwork found", extra={"track_id": track.identifier, "track": track.title})
+
+    _artwork[track.identifier] = resolved
+    while len(_artwork) > constants.PREFETCH_CACHE_SIZE:
+        _artwork.popitem(last=False)
@@ -0,0 +1,73 @@
+import asyncio
+
+import discord
+
+from . import Constants as constants
+from .Logger import logger
+
+
+class Presence:
+    """Human listener count per voice channel, kept up to date from voice events.
+
+    When the channel a player is in runs out of listeners the player is torn
+    down after a grace period, unless someone joins again before that.
+    """
+
+    def __init__(self, grace: float):
+        self.grace = grace
+        self._listeners: dict[int, int] = {}
+        self._pending: dict[int, asyncio.Task] = {}
+
+    def listeners(self, channel: discord.abc.Connectable | None) -> int:
+        return 0 if channel is None else self._listeners.get(channel.id, 0)
+
+    def rebuild(self, guilds: list[discord.Guild]):
+        for guild in guilds:
+            for channel in guild.voice_channels + guild.stage_channels:
+                humans = sum(not m.bot for m in channel.members)
+                if humans:
+                    self._listeners[channel.id] = humans
+                else:
+                    self._listeners.pop(channel.id, None)
+            if guild.voice_client is not None:
+                self.check(guild, guild.voice_client.channel)
+
+    def update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        if member.bot:
+            return
+        if before.channel is not None:
+            count = self._listeners.get(before.channel.id, 0) - 1
+            if count > 0:
+                self._listeners[before.channel.id] = count
+            else:
+                self._listeners.pop(before.channel.id, None)
+        if after.channel is not None:
+            self._listeners[after.channel.id] = self._listeners.get(after.channel.id, 0) + 1
+
+    def check(self, guild: discord.Guild, channel: discord.abc.Connectable | None):
+        if channel is None or self.listeners(channel):
+            self.cancel(guild.id)
+        elif guild.id not in self._pending:
+            self._pending[guild.id] = asyncio.create_task(self._disconnect_later(guild))
+
+    def cancel(self, guild_id: int):
+        task = self._pending.pop(guild_id, None)
+        if task is not None:
+            task.cancel()
+
+    def close(self):
+        for task in self._pending.values():
+            task.cancel()
+        self._pending.clear()
+
+    async def _disconnect_later(self, guild: discord.Guild):
+        await asyncio.sleep(self.grace)
+        del self._pending[guild.id]
+        player = guild.voice_client
+        if player is None or self.listeners(player.channel):
+            return
+        logger.info("Leaving empty voice channel", extra={"guild": guild.name, "guild_id": guild.id, "grace": self.grace})
+        await player.teardown()
+
+
+presence = Presence(constants.EMPTY_CHANNEL_GRACE)
@@ -0,0 +1,36 @@
+import time
+from contextlib import contextmanager
+
+from .Logger import logger
+
+
+class StartupProfiler:
+    def __init__(self, started: float | None = None):
+        self.started = time.perf_counter() if started is None else started
+        self.phases: dict[str, float] = {}
+        self.reported = False
+
+    def record(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def report(self):
+        if self.reported:
+            return
+        self.reported = True
+
+        phases = {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()}
+        for name, ms in phases.items():
+            logger.info("Startup phase", extra={"phase": name, "duration_ms": ms})
+        logger.info("Time to ready", extra={"duration_ms": round(self.elapsed * 1000, 1), "phases": phases})
@@ -0,0 +1,145 @@
+import asyncio
+import heapq
+import time
+from collections import OrderedDict, defaultdict, deque
+
+import wavelink
+
+from . import Constants as constants
+from .History import history
+from .Logger import logger
+from .TrackIndex import track_index
+
+
+class _Guild:
+    __slots__ = ("rows", "recent", "played", "last_seen")
+
+    def __init__(self):
+        # Sparse co-occurrence matrix: track id -> {neighbour track id: weight}.
+        self.rows: OrderedDict[str, dict[str, float]] = OrderedDict()
+        self.recent: deque[str] = deque(maxlen=constants.RECOMMEND_WINDOW)
+        self.played: deque[str] = deque(maxlen=constants.RECOMMEND_EXCLUDE)
+        self.last_seen = 0.0
+
+
+class Recommender:
+    """Per guild track co-occurrence learned from what each guild plays.
+
+    Every started track is linked to the tracks played shortly before it in
+    the same session, weighted by how close together they were. Candidates
+    for the next track are the rows of the recent tracks summed together.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._guilds: dict[int, _Guild] = defaultdict(_Guild)
+
+    def observe(self, guild_id: int, track_id: str, at: float | None = None):
+        at = time.time() if at is None else at
+        guild = self._guilds[guild_id]
+        if at - guild.last_seen > constants.RECOMMEND_SESSION_GAP:
+            guild.recent.clear()
+        guild.last_seen = at
+
+        row = self._row(guild, track_id)
+        for distance, previous in enumerate(reversed(guild.recent), start=1):
+            if previous == track_id:
+                continue
+            weight = 1 / distance
+            row[previous] = row.get(previous, 0.0) + weight
+            other = self._row(guild, previous)
+            other[track_id] = other.get(track_id, 0.0) + weight
+            self._trim(other)
+        self._trim(row)
+
+        guild.recent.append(track_id)
+        guild.played.append(track_id)
+        self._evict(guild)
+
+    def recommend(self, guild_id: int, limit: int, exclude: set[str] = frozenset()) -> list[wavelink.Playable]:
+        guild = self._guilds.get(guild_id)
+        if guild is None or not guild.recent:
+            return []
+
+        skip = exclude | set(guild.played)
+        scores: dict[str, float] = defaultdict(float)
+        for age, seed in enumerate(reversed(guild.recent)):
+            weight = 1 / (age + 1)
+            for other, count in guild.rows.get(seed, {}).items():
+                if other not in skip:
+                    scores[other] += weight * count
+
+        tracks = []
+        for track_id in heapq.nlargest(limit * 2, scores, key=scores.__getitem__):
+            track = track_index.get(track_id)
+            if track is not None:
+                tracks.append(track)
+                if len(tracks) == limit:
+                    break
+        return tracks
+
+    async def load(self):
+        rows = await history.query(
+            "SELECT guild_id, track_id, time FROM plays WHERE event = 'started' ORDER BY id DESC LIMIT ?",
+            (constants.RECOMMEND_HISTORY_ROWS,)
+        )
+        guilds = await asyncio.to_thread(self._replay, rows)
+        # Plays observed while the history was being replayed are newer.
+        guilds.update(self._guilds)
+        self._guilds = guilds
+        logger.info("Loaded recommendations", extra={"guilds": len(self._guilds), "plays": len(rows)})
+
+    def _replay(self, rows: list[tuple]) -> dict[int, _Guild]:
+        replay = Recommender(self.capacity)
+        for guild_id, track_id, played in reversed(rows):
+            replay.observe(guild_id, track_id, played)
+        return replay._guilds
+
+    def _row(self, guild: _Guild, track_id: str) -> dict[str, float]:
+        row = guild.rows.get(track_id)
+        if row is None:
+            row = guild.rows[track_id] = {}
+        else:
+            guild.rows.move_to_end(track_id)
+        return row
+
+    def _trim(self, row: dict[str, float]):
+        if len(row) > 2 * constants.RECOMMEND_ROW_SIZE:
+            keep = heapq.nlargest(constants.RECOMMEND_ROW_SIZE, row.items(), key=lambda item: item[1])
+            row.clear()
+            row.update(keep)
+
+    def _evict(self, guild: _Guild):
+        while len(guild.rows) > self.capacity:
+            track_id, row = guild.rows.popitem(last=False)
+            for other in row:
+                neighbours = guild.rows.get(other)
+                if neighbours is not None:
+                    neighbours.pop(track_id, None)
+
+
+def recommended(track: wavelink.Playable) -> bool:
+    """Whether autoplay picked the track, either through Lavalink or locally."""
+    return track.recommended or bool(dict(track.extras).get("recommended"))
+
+
+def refill(player: wavelink.Player):
+    """Keep locally recommended tracks at the front of the auto_queue."""
+    if player.autoplay is not wavelink.AutoPlayMode.enabled or player.queue or player.guild is None:
+        return
+
+    local = [t for t in player.auto_queue if dict(t.extras).get("recommended")]
+    missing = constants.RECOMMEND_AHEAD - len(local)
+    if missing <= 0:
+        return
+
+    queued = {t.identifier for t in player.auto_queue}
+    if player.current is not None:
+        queued.add(player.current.identifier)
+    for track in recommender.recommend(player.guild.id, missing, queued):
+        track.extras = {"recommended": True}
+        player.auto_queue.put_at(len(local), track)
+        local.append(track)
+
+
+recommender = Recommender(constants.RECOMMEND_CAPACITY)
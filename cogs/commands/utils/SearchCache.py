@@ -0,0 +1,220 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import typing as t
+from collections import OrderedDict
+
+import wavelink
+
+from . import Constants as constants
+from . import Metrics as metrics
+from . import Tracing as tracing
+from .Logger import logger
+
+
+def normalize(query: str) -> str:
+    query = " ".join(query.split())
+    if "://" in query:
+        return query
+    return query.lower()
+
+
+def encode(result: wavelink.Search) -> dict:
+    if isinstance(result, wavelink.Playlist):
+        return {
+            "playlist": {
+                "info": {"name": result.name, "selectedTrack": result.selected},
+                "pluginInfo": {
+                    "type": result.type,
+                    "url": result.url,
+                    "artworkUrl": result.artwork,
+                    "author": result.author,
+                },
+                "tracks": [track.raw_data for track in result.tracks],
+            }
+        }
+    return {"tracks": [track.raw_data for track in result]}
+
+
+def decode(payload: dict) -> wavelink.Search:
+    if "playlist" in payload:
+        return wavelink.Playlist(payload["playlist"])
+    return [wavelink.Playable(track) for track in payload["tracks"]]
+
+
+class SearchCache:
+    """Search results kept in memory and in SQLite.
+
+    Database work runs in a thread. Hits only mark the row as accessed in
+    memory; the marks are written together with the next put, and the table
+    is trimmed back to capacity every SEARCH_CACHE_TRIM_INTERVAL puts.
+    """
+
+    def __init__(self, path: str, ttl: int, capacity: int, memory_capacity: int):
+        self.path = path
+        self.ttl = ttl
+        self.capacity = capacity
+        self.memory_capacity = memory_capacity
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._accessed: dict[str, float] = {}
+        self._puts = 0
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "query TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+                "expires REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS search_cache_accessed ON search_cache (accessed)")
+            self._db.commit()
+        return self._db
+
+    async def get(self, query: str) -> t.Optional[wavelink.Search]:
+        key = normalize(query)
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is None:
+            row = await asyncio.to_thread(self._read, key)
+            if row is not None:
+                entry = (row[0], json.loads(row[1]))
+                self._accessed[key] = now
+                self._remember(key, entry)
+
+        if entry is None or entry[0] < now:
+            if entry is not None:
+                await self.forget(key)
+            self.misses += 1
+            return None
+
+        self._memory.move_to_end(key)
+        self.hits += 1
+        return decode(entry[1])
+
+    async def put(self, query: str, result: wavelink.Search):
+        key = normalize(query)
+        now = time.time()
+        entry = (now + self.ttl, encode(result))
+        self._remember(key, entry)
+        self._accessed.pop(key, None)
+
+        self._puts += 1
+        trim = self._puts % constants.SEARCH_CACHE_TRIM_INTERVAL == 0
+        accessed, self._accessed = self._accessed, {}
+        row = (key, json.dumps(entry[1], separators=(",", ":")), entry[0], now)
+        try:
+            await asyncio.to_thread(self._write, row, accessed, trim)
+        except Exception:
+            # Marks taken since are newer, keep those.
+            for marked, at in accessed.items():
+                self._accessed.setdefault(marked, at)
+            raise
+
+    async def forget(self, key: str):
+        self._memory.pop(key, None)
+        self._accessed.pop(key, None)
+        await asyncio.to_thread(self._delete, key)
+
+    async def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory": len(self._memory),
+            "stored": await asyncio.to_thread(self._count),
+        }
+
+    async def close(self):
+        if self._accessed:
+            accessed, self._accessed = self._accessed, {}
+            await asyncio.to_thread(self._write, None, accessed, False)
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: str, entry: tuple[float, dict]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_capacity:
+            self._memory.popitem(last=False)
+
+    def _read(self, key: str) -> tuple | None:
+        with self._lock:
+            return self.db.execute("SELECT expires, payload FROM search_cache WHERE query = ?", (key,)).fetchone()
+
+    def _count(self) -> int:
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+
+    def _delete(self, key: str):
+        with self._lock, self.db:
+            self.db.execute("DELETE FROM search_cache WHERE query = ?", (key,))
+
+    def _write(self, row: tuple | None, accessed: dict[str, float], trim: bool):
+        with self._lock, self.db:
+            if row is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO search_cache (query, payload, expires, accessed) VALUES (?, ?, ?, ?)", row
+                )
+            self.db.executemany(
+                "UPDATE search_cache SET accessed = ? WHERE query = ?",
+                [(at, key) for key, at in accessed.items()]
+            )
+            if not trim:
+                return
+            self.db.execute("DELETE FROM search_cache WHERE expires < ?", (time.time(),))
+            excess = self.db.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0] - self.capacity
+            if excess > 0:
+                self.db.execute(
+                    "DELETE FROM search_cache WHERE query IN "
+                    "(SELECT query FROM search_cache ORDER BY accessed LIMIT ?)",
+                    (excess,)
+                )
+
+
+cache = SearchCache(
+    constants.SEARCH_CACHE_PATH,
+    constants.SEARCH_CACHE_TTL,
+    constants.SEARCH_CACHE_CAPACITY,
+    constants.SEARCH_CACHE_MEMORY_CAPACITY
+)
+
+
+async def search(query: str) -> wavelink.Search:
+    with tracing.span("search") as span:
+        result = await cache.get(query)
+        if span is not None:
+            span.attrs["cached"] = result is not None
+        if result is not None:
+            metrics.search_total.inc("cached")
+            return result
+
+        start = time.perf_counter()
+        try:
+            result = await wavelink.Playable.search(query)
+        except Exception:
+            metrics.search_total.inc("error")
+            raise
+        finally:
+            metrics.search_duration.observe(value=time.perf_counter() - start)
+
+    metrics.search_total.inc("found" if result else "empty")
+    if result:
+        try:
+            await cache.put(query, result)
+        except Exception:
+            logger.exception("Failed to cache search result", extra={"query": query})
+    return result
@@ -0,0 +1,153 @@
+import gzip
+import json
+import os
+import time
+
+import discord
+import wavelink
+
+from . import Constants as constants
+from . import Prefetch as prefetch
+from .CompactTrack import CompactTrack
+from .History import requester
+from .Logger import logger
+from .Player import Player
+
+# Players are stored as encoded Lavalink tracks plus the requester id. They
+# are decoded locally on restart, without a search or a call to Lavalink.
+VERSION = 2
+
+
+def _pack(track: wavelink.Playable) -> list:
+    return [track.encoded, requester(track)]
+
+
+def snapshot(player: wavelink.Player) -> dict | None:
+    if player.channel is None or (player.current is None and not player.queue):
+        return None
+
+    text_channel = getattr(player, "text_channel", None)
+    return {
+        "guild": player.guild.id,
+        "channel": player.channel.id,
+        "text_channel": text_channel.id if text_channel is not None else None,
+        "current": _pack(player.current) if player.current is not None else None,
+        "position": player.position,
+        "paused": player.paused,
+        "volume": player.volume,
+        "autoplay": player.autoplay.value,
+        "mode": player.queue.mode.value,
+        "fair": player.queue.fair_state(),
+        "queue": [_pack(track) for track in player.queue]
+    }
+
+
+def _write(path: str, players: list[dict], saved: float):
+    data = json.dumps({"version": VERSION, "saved": saved, "players": players}, separators=(",", ":"))
+    tmp = f"{path}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def save(bot: discord.Client, path: str = constants.SNAPSHOT_PATH) -> int:
+    players = [
+        state for state in (snapshot(p) for p in bot.voice_clients if isinstance(p, wavelink.Player))
+        if state is not None
+    ]
+    if not players:
+        # An older snapshot, such as one kept for failed restores, would
+        # otherwise bring those players back on the next start.
+        if os.path.exists(path):
+            os.remove(path)
+        return 0
+
+    _write(path, players, time.time())
+    logger.info("Saved player snapshot", extra={"players": len(players), "bytes": os.path.getsize(path)})
+    return len(players)
+
+
+def load(path: str = constants.SNAPSHOT_PATH) -> dict | None:
+    """Read a snapshot that is still worth restoring. Unusable ones are deleted."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        logger.exception("Failed to read player snapshot", extra={"path": path})
+        os.remove(path)
+        return None
+
+    age = time.time() - data.get("saved", 0)
+    if data.get("version") != VERSION or age > constants.SNAPSHOT_MAX_AGE:
+        logger.info("Discarded stale player snapshot", extra={"age_s": round(age)})
+        os.remove(path)
+        return None
+
+    return data
+
+
+def decode(packed: list[list]) -> list[CompactTrack]:
+    return [CompactTrack.from_encoded(encoded, user_id) for encoded, user_id in packed]
+
+
+async def restore(bot: discord.Client, state: dict) -> bool:
+    guild = bot.get_guild(state["guild"])
+    if guild is None or guild.voice_client is not None:
+        return False
+
+    channel = guild.get_channel(state["channel"])
+    if not isinstance(channel, discord.VoiceChannel) or not [m for m in channel.members if not m.bot]:
+        return False
+
+    current = CompactTrack.from_encoded(*state["current"]).to_playable() if state["current"] else None
+    tracks = decode(state["queue"])
+
+    player: Player = await channel.connect(cls=Player)
+    player.text_channel = guild.get_channel(state["text_channel"]) or channel
+    player.autoplay = wavelink.AutoPlayMode(state["autoplay"])
+    player.queue.mode = wavelink.QueueMode(state["mode"])
+    # Restored as saved, so fair mode does not reorder what users arranged.
+    player.queue.restore(tracks, state["fair"])
+
+    if current is not None:
+        player.queue._loaded = current
+        await player.play(
+            current,
+            start=min(state["position"], current.length),
+            paused=state["paused"],
+            volume=state["volume"],
+            add_history=False
+        )
+    elif player.queue:
+        await player.play(player.queue.get(), volume=state["volume"])
+
+    prefetch.look_ahead(player)
+    return True
+
+
+async def restore_all(bot: discord.Client, path: str = constants.SNAPSHOT_PATH) -> int:
+    data = load(path)
+    if data is None:
+        return 0
+
+    restored = 0
+    failed = []
+    for state in data["players"]:
+        try:
+            restored += await restore(bot, state)
+        except Exception:
+            failed.append(state)
+            logger.exception("Failed to restore player", extra={"guild_id": state.get("guild")})
+
+    # Players that failed are kept for the next start, until the snapshot
+    # goes stale.
+    if failed:
+        _write(path, failed, data["saved"])
+    else:
+        os.remove(path)
+
+    if restored:
+        logger.info("Restored players", extra={"players": restored})
+    return restored
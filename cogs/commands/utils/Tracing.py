@@ -0,0 +1,172 @@
+import cProfile
+import io
+import json
+import logging
+import pstats
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import discord
+from discord.ext import commands
+
+from . import Constants as constants
+from . import Logger as log
+
+slow_logger = logging.getLogger("labbebot.slow")
+
+_current: ContextVar["Span | None"] = ContextVar("span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "attrs", "start", "end", "children")
+
+    def __init__(self, name: str, attrs: dict | None = None, start: float | None = None):
+        self.name = name
+        self.attrs = attrs or {}
+        self.start = time.perf_counter() if start is None else start
+        self.end: float | None = None
+        self.children: list[Span] = []
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+    def to_dict(self, origin: float | None = None) -> dict:
+        origin = self.start if origin is None else origin
+        entry = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 2),
+            "duration_ms": round(self.duration * 1000, 2),
+        }
+        entry.update(self.attrs)
+        if self.children:
+            entry["children"] = [child.to_dict(origin) for child in self.children]
+        return entry
+
+
+@contextmanager
+def span(name: str, **attrs):
+    parent = _current.get()
+    # Tasks started during a command inherit its context; once that span has
+    # ended their work no longer belongs to the trace.
+    if parent is None or parent.end is not None:
+        yield None
+        return
+
+    child = Span(name, attrs)
+    parent.children.append(child)
+    token = _current.set(child)
+    try:
+        yield child
+    finally:
+        child.end = time.perf_counter()
+        _current.reset(token)
+
+
+def instrument_http(http: discord.http.HTTPClient):
+    request = http.request
+
+    async def traced_request(route: discord.http.Route, **kwargs):
+        with span("discord", method=route.method, path=route.path):
+            return await request(route, **kwargs)
+
+    http.request = traced_request
+
+
+class Rule:
+    def __init__(self, target: str | None, rate: float = 1.0, remaining: int | None = None):
+        self.target = target
+        self.rate = rate
+        self.remaining = remaining
+
+    def matches(self, ctx: commands.Context) -> bool:
+        if self.remaining is not None and self.remaining <= 0:
+            return False
+        if self.target is None:
+            return True
+        return self.target == ctx.command.qualified_name or (ctx.guild is not None and self.target == str(ctx.guild.id))
+
+    def describe(self) -> str:
+        text = self.target or "all"
+        if self.rate < 1:
+            text += f" at {self.rate:.0%}"
+        if self.remaining is not None:
+            text += f", {self.remaining} left"
+        return text
+
+
+class Tracer:
+    def __init__(self):
+        self.sampling: Rule | None = None
+        self.profiling: Rule | None = None
+        self.traces: deque[dict] = deque(maxlen=constants.TRACE_BUFFER_SIZE)
+        self.profile_stats: pstats.Stats | None = None
+        self._profiler: cProfile.Profile | None = None
+
+    def begin(self, ctx: commands.Context):
+        now = time.perf_counter()
+        root = Span(ctx.command.qualified_name, start=getattr(ctx, "received_at", now))
+        root.children.append(Span("parse", start=root.start))
+        root.children[0].end = now
+        ctx.trace = root
+        ctx.trace_token = _current.set(root)
+
+        if self._profiler is None and self.profiling is not None and self.profiling.matches(ctx):
+            self.profiling.remaining -= 1
+            ctx.profiled = True
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def finish(self, ctx: commands.Context):
+        root: Span = ctx.trace
+        root.end = time.perf_counter()
+        root.attrs["failed"] = ctx.command_failed
+        _current.reset(ctx.trace_token)
+
+        if getattr(ctx, "profiled", False) and self._profiler is not None:
+            self._profiler.disable()
+            if self.profile_stats is None:
+                self.profile_stats = pstats.Stats(self._profiler)
+            else:
+                self.profile_stats.add(self._profiler)
+            self._profiler = None
+
+        trace = None
+        if root.duration >= constants.SLOW_COMMAND_THRESHOLD:
+            trace = root.to_dict()
+            slow_logger.warning("Slow command", extra=log.fields(ctx, command=root.name, duration_ms=trace["duration_ms"], spans=trace))
+
+        if self.sampling is not None and self.sampling.matches(ctx) and random.random() < self.sampling.rate:
+            trace = trace or root.to_dict()
+            trace["guild_id"] = ctx.guild.id if ctx.guild else None
+            self.traces.append(trace)
+
+    def sample(self, target: str | None, rate: float):
+        self.sampling = Rule(target, rate=rate)
+
+    def profile(self, target: str | None, count: int):
+        self.profiling = Rule(target, remaining=count)
+
+    def stop(self):
+        self.sampling = None
+        self.profiling = None
+
+    def dump(self) -> list[discord.File]:
+        files = []
+        if self.traces:
+            data = json.dumps(list(self.traces), indent=1).encode()
+            files.append(discord.File(io.BytesIO(data), filename="traces.json"))
+            self.traces.clear()
+        if self.profile_stats is not None:
+            out = io.StringIO()
+            self.profile_stats.stream = out
+            self.profile_stats.sort_stats("cumulative").print_stats(constants.PROFILE_DUMP_LINES)
+            files.append(discord.File(io.BytesIO(out.getvalue().encode()), filename="profile.txt"))
+            self.profile_stats = None
+        return files
+
+
+tracer = Tracer()
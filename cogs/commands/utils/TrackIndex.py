@@ -0,0 +1,200 @@
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import wavelink
+
+from . import Constants as constants
+from .Logger import logger
+
+_WORD = re.compile(r"[^\w]+")
+
+
+def trigrams(text: str) -> set[str]:
+    grams = set()
+    for word in _WORD.split(text.lower()):
+        if not word:
+            continue
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def dice(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class _Entry:
+    __slots__ = ("payload", "title", "grams", "uses")
+
+    def __init__(self, payload: dict, uses: int = 0):
+        info = payload["info"]
+        self.payload = payload
+        self.title = trigrams(info["title"])
+        self.grams = self.title | trigrams(info["author"])
+        self.uses = uses
+
+
+class TrackIndex:
+    """Trigram index over the titles and authors of tracks queued before.
+
+    Postings are kept in memory and updated on every add. New and touched
+    entries are written to SQLite in batches so the index survives restarts.
+    """
+
+    def __init__(self, path: str, capacity: int):
+        self.path = path
+        self.capacity = capacity
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._postings: dict[str, set[str]] = {}
+        self._uris: dict[str, str] = {}
+        self._dirty: set[str] = set()
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS tracks ("
+                "track_id TEXT PRIMARY KEY, payload TEXT NOT NULL, uses INTEGER NOT NULL, used REAL NOT NULL)"
+            )
+        return self._db
+
+    def add(self, track: wavelink.Playable):
+        key = track.identifier
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _Entry(track.raw_data)
+            self._insert(key, entry)
+        else:
+            self._entries.move_to_end(key)
+        entry.uses += 1
+        self._dirty.add(key)
+        self._evict()
+
+    def add_many(self, tracks: list[wavelink.Playable]):
+        for track in tracks:
+            self.add(track)
+
+    def get(self, key: str) -> wavelink.Playable | None:
+        entry = self._entries.get(key)
+        return None if entry is None else wavelink.Playable(entry.payload)
+
+    def search(self, query: str, limit: int = 5, threshold: float = constants.TRACK_INDEX_THRESHOLD) -> list[tuple[float, wavelink.Playable]]:
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        shared: Counter[str] = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+
+        # Rank by Dice coefficient over title and author, then rescore the best
+        # candidates against the title alone so "song name" queries still match.
+        ranked = []
+        for key, count in shared.most_common(limit * 4):
+            entry = self._entries[key]
+            score = max(2 * count / (len(grams) + len(entry.grams)), dice(grams, entry.title))
+            if score >= threshold:
+                ranked.append((score, entry.uses, key))
+        ranked.sort(reverse=True)
+        return [(score, wavelink.Playable(self._entries[key].payload)) for score, _, key in ranked[:limit]]
+
+    def match(self, query: str) -> wavelink.Playable | None:
+        query = " ".join(query.split())
+        key = self._uris.get(query)
+        if key is not None:
+            return wavelink.Playable(self._entries[key].payload)
+        if "://" in query or ":" in query.split(" ", 1)[0]:
+            return None
+
+        results = self.search(query, limit=2, threshold=constants.TRACK_INDEX_MATCH)
+        if not results:
+            return None
+        if len(results) > 1 and results[0][0] - results[1][0] < constants.TRACK_INDEX_MARGIN:
+            return None
+        return results[0][1]
+
+    async def load(self):
+        rows = await asyncio.to_thread(self._read)
+        for track_id, payload, uses in reversed(rows):
+            if track_id not in self._entries:
+                self._insert(track_id, _Entry(json.loads(payload), uses))
+        logger.info("Loaded track index", extra={"tracks": len(self._entries)})
+
+    async def flush(self):
+        if not self._dirty:
+            return
+        rows = self._take_dirty()
+        try:
+            await asyncio.to_thread(self._write, rows)
+        except Exception:
+            logger.exception("Failed to write track index", extra={"rows": len(rows)})
+
+    def close(self):
+        if self._dirty:
+            self._write(self._take_dirty())
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _take_dirty(self) -> list[tuple]:
+        keys, self._dirty = self._dirty, set()
+        now = time.time()
+        return [
+            (key, json.dumps(self._entries[key].payload), self._entries[key].uses, now)
+            for key in keys if key in self._entries
+        ]
+
+    def _insert(self, key: str, entry: _Entry):
+        self._entries[key] = entry
+        for gram in entry.grams:
+            self._postings.setdefault(gram, set()).add(key)
+        uri = entry.payload["info"].get("uri")
+        if uri:
+            self._uris[uri] = key
+
+    def _evict(self):
+        while len(self._entries) > self.capacity:
+            key, entry = self._entries.popitem(last=False)
+            for gram in entry.grams:
+                postings = self._postings[gram]
+                postings.discard(key)
+                if not postings:
+                    del self._postings[gram]
+            self._uris.pop(entry.payload["info"].get("uri"), None)
+            self._dirty.discard(key)
+
+    def _read(self) -> list[tuple]:
+        with self._lock:
+            return self.db.execute(
+                "SELECT track_id, payload, uses FROM tracks ORDER BY used DESC LIMIT ?", (self.capacity,)
+            ).fetchall()
+
+    def _write(self, rows: list[tuple]):
+        with self._lock, self.db:
+            self.db.executemany(
+                "INSERT INTO tracks (track_id, payload, uses, used) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (track_id) DO UPDATE SET payload = excluded.payload, uses = excluded.uses, used = excluded.used",
+                rows
+            )
+            self.db.execute(
+                "DELETE FROM tracks WHERE track_id NOT IN (SELECT track_id FROM tracks ORDER BY used DESC LIMIT ?)",
+                (self.capacity,)
+            )
+
+
+track_index = TrackIndex(constants.TRACK_INDEX_PATH, constants.TRACK_INDEX_CAPACITY)
@@ -0,0 +1,441 @@
+import heapq
+import random
+import typing as t
+
+import wavelink
+
+from .CompactTrack import CompactTrack
+
+
+class _Node:
+    __slots__ = ("value", "priority", "tag", "left", "right", "size", "length")
+
+    def __init__(self, value: wavelink.Playable | CompactTrack, priority: float | None = None, tag: float = 0.0):
+        self.value = CompactTrack.from_playable(value)
+        self.priority = random.random() if priority is None else priority
+        self.tag = tag
+        self.left: _Node | None = None
+        self.right: _Node | None = None
+        self.size = 1
+        self.length = value.length
+
+    def update(self):
+        self.size = 1
+        self.length = self.value.length
+        if self.left is not None:
+            self.size += self.left.size
+            self.length += self.left.length
+        if self.right is not None:
+            self.size += self.right.size
+            self.length += self.right.length
+
+
+def _size(node: _Node | None) -> int:
+    return node.size if node is not None else 0
+
+
+def _split(node: _Node | None, k: int) -> tuple[_Node | None, _Node | None]:
+    if node is None:
+        return None, None
+    if k <= _size(node.left):
+        left, node.left = _split(node.left, k)
+        node.update()
+        return left, node
+    node.right, right = _split(node.right, k - _size(node.left) - 1)
+    node.update()
+    return node, right
+
+
+def _merge(left: _Node | None, right: _Node | None) -> _Node | None:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+def _build(values: t.Iterable[wavelink.Playable], tags: t.Iterable[float] | None = None) -> _Node | None:
+    stack: list[_Node] = []
+    for value, tag in zip(values, tags) if tags is not None else ((value, 0.0) for value in values):
+        node = _Node(value, tag=tag)
+        last = None
+        while stack and stack[-1].priority < node.priority:
+            last = stack.pop()
+        node.left = last
+        if stack:
+            stack[-1].right = node
+        stack.append(node)
+
+    if not stack:
+        return None
+
+    root = stack[0]
+    order: list[_Node] = []
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        order.append(node)
+        if node.left is not None:
+            pending.append(node.left)
+        if node.right is not None:
+            pending.append(node.right)
+    for node in reversed(order):
+        node.update()
+    return root
+
+
+def _walk(node: _Node | None) -> t.Iterator[_Node]:
+    stack: list[_Node] = []
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        yield node
+        node = node.right
+
+
+class TrackTree:
+    """Implicit treap holding the queue in order.
+
+    In fair mode every track also carries a virtual finish tag. A requester's
+    next track is tagged one round after their previous one, or after the
+    track playing now, and is inserted behind all tracks with a lower tag.
+    Requesters therefore take turns, however much each of them queued.
+    """
+
+    def __init__(self, values: t.Iterable[wavelink.Playable] = ()):
+        self._root = _build(values)
+        self.version = 0
+        self._fair = False
+        self._virtual = 0.0
+        self._finish: dict[int | None, float] = {}
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def __bool__(self) -> bool:
+        return self._root is not None
+
+    def __iter__(self) -> t.Iterator[CompactTrack]:
+        return self.iter_from(0)
+
+    def __reversed__(self) -> t.Iterator[CompactTrack]:
+        stack: list[_Node] = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.right
+            node = stack.pop()
+            yield node.value
+            node = node.left
+
+    def __contains__(self, item: object) -> bool:
+        return any(value == item for value in self)
+
+    def __getitem__(self, index: t.SupportsIndex | slice) -> CompactTrack | list[CompactTrack]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                values = self.iter_from(start)
+                return [next(values) for _ in range(max(stop - start, 0))]
+            return list(self)[index]
+        return self._node_at(index).value
+
+    def __setitem__(self, index: t.SupportsIndex, value: wavelink.Playable):
+        index = self._normalize(index)
+        path: list[_Node] = []
+        node = self._root
+        while True:
+            path.append(node)
+            left_size = _size(node.left)
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                break
+            else:
+                index -= left_size + 1
+                node = node.right
+        node.value = CompactTrack.from_playable(value)
+        for node in reversed(path):
+            node.update()
+        self.version += 1
+
+    def __delitem__(self, index: t.SupportsIndex | slice):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                left, rest = _split(self._root, start)
+                _, right = _split(rest, max(stop - start, 0))
+                self._root = _merge(left, right)
+            else:
+                values = list(self)
+                del values[index]
+                self._rebuild(values)
+            self.version += 1
+            return
+        self.pop(index)
+
+    @property
+    def length(self) -> int:
+        return self._root.length if self._root is not None else 0
+
+    @property
+    def fair(self) -> bool:
+        return self._fair
+
+    @fair.setter
+    def fair(self, value: bool):
+        if value == self._fair:
+            return
+        self._fair = value
+        self._rebuild(list(self))
+        self.version += 1
+
+    def iter_from(self, start: int) -> t.Iterator[CompactTrack]:
+        stack: list[_Node] = []
+        node = self._root
+        while node is not None:
+            left_size = _size(node.left)
+            if start < left_size:
+                stack.append(node)
+                node = node.left
+            elif start == left_size:
+                stack.append(node)
+                break
+            else:
+                start -= left_size + 1
+                node = node.right
+
+        while stack:
+            node = stack.pop()
+            yield node.value
+            node = node.right
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+    def append(self, value: wavelink.Playable):
+        if self._fair:
+            self._place(value, self._tag(value))
+        else:
+            self._root = _merge(self._root, _Node(value))
+        self.version += 1
+
+    def extend(self, values: t.Iterable[wavelink.Playable]):
+        if self._fair:
+            tagged = sorted(((self._tag(value), value) for value in values), key=lambda item: item[0])
+            index = self._rank(tagged[0][0]) if tagged else len(self)
+            if len(self) - index > 16 * len(tagged):
+                for tag, value in tagged:
+                    self._place(value, tag)
+            else:
+                # Merge the batch into the part of the queue behind its first
+                # track in one pass, usually just the end of the queue.
+                left, right = _split(self._root, index)
+                queued = ((node.tag, node.value) for node in _walk(right))
+                merged = list(heapq.merge(queued, tagged, key=lambda item: item[0]))
+                self._root = _merge(left, _build([value for _, value in merged], [tag for tag, _ in merged]))
+        else:
+            self._root = _merge(self._root, _build(values))
+        self.version += 1
+
+    def insert(self, index: int, value: wavelink.Playable):
+        index = min(max(index + len(self) if index < 0 else index, 0), len(self))
+        # Explicit positions win over fairness; borrow the neighbour's tag so
+        # the tags stay ordered for later inserts.
+        tag = self._node_at(index - 1).tag if self._fair and index else self._virtual
+        left, right = _split(self._root, index)
+        self._root = _merge(_merge(left, _Node(value, tag=tag)), right)
+        self.version += 1
+
+    def pop(self, index: t.SupportsIndex = -1) -> CompactTrack:
+        index = self._normalize(index)
+        left, rest = _split(self._root, index)
+        node, right = _split(rest, 1)
+        self._root = _merge(left, right)
+        self.version += 1
+        if self._fair:
+            if self._root is None:
+                self._reset_tags()
+            elif index == 0:
+                self._virtual = max(self._virtual, node.tag)
+        return node.value
+
+    def index(self, item: wavelink.Playable) -> int:
+        for i, value in enumerate(self):
+            if value == item:
+                return i
+        raise ValueError(f"{item!r} is not in queue")
+
+    def remove(self, item: wavelink.Playable):
+        self.pop(self.index(item))
+
+    def clear(self):
+        self._root = None
+        self._reset_tags()
+        self.version += 1
+
+    def copy(self) -> "TrackTree":
+        nodes = list(_walk(self._root))
+        tree = TrackTree()
+        tree._root = _build([node.value for node in nodes], [node.tag for node in nodes])
+        tree._fair = self._fair
+        tree._virtual = self._virtual
+        tree._finish = dict(self._finish)
+        return tree
+
+    def fair_state(self) -> dict | None:
+        if not self._fair:
+            return None
+        return {
+            "tags": [node.tag for node in _walk(self._root)],
+            "virtual": self._virtual,
+            "finish": list(self._finish.items())
+        }
+
+    def restore(self, values: list[wavelink.Playable | CompactTrack], fair: dict | None = None):
+        """Replace the contents in the given order, with the tags from fair_state."""
+        self._fair = fair is not None
+        if fair is None:
+            self._root = _build(values)
+            self._reset_tags()
+        else:
+            self._root = _build(values, fair["tags"])
+            self._virtual = fair["virtual"]
+            self._finish = dict(fair["finish"])
+        self.version += 1
+
+    def shuffle(self, seed: int | None = None) -> int:
+        seed = random.getrandbits(32) if seed is None else seed
+        values = list(self)
+        # Random.shuffle is a Fisher-Yates shuffle; its own generator makes the
+        # result repeatable from the seed.
+        random.Random(seed).shuffle(values)
+        self._rebuild(values)
+        self.version += 1
+        return seed
+
+    def _tag(self, value: wavelink.Playable) -> float:
+        requester = dict(value.extras).get("requester")
+        tag = max(self._virtual, self._finish.get(requester, 0.0)) + 1
+        self._finish[requester] = tag
+        return tag
+
+    def _rank(self, tag: float) -> int:
+        index = 0
+        node = self._root
+        while node is not None:
+            if node.tag <= tag:
+                index += _size(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return index
+
+    def _place(self, value: wavelink.Playable, tag: float):
+        left, right = _split(self._root, self._rank(tag))
+        self._root = _merge(_merge(left, _Node(value, tag=tag)), right)
+
+    def _rebuild(self, values: list[wavelink.Playable]):
+        if not self._fair:
+            self._root = _build(values)
+            return
+        self._reset_tags()
+        tagged = sorted(((self._tag(value), value) for value in values), key=lambda item: item[0])
+        self._root = _build([value for _, value in tagged], [tag for tag, _ in tagged])
+
+    def _reset_tags(self):
+        self._virtual = 0.0
+        self._finish.clear()
+
+    def _normalize(self, index: t.SupportsIndex) -> int:
+        index = int(index)
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("queue index out of range")
+        return index
+
+    def _node_at(self, index: t.SupportsIndex) -> _Node:
+        index = self._normalize(index)
+        node = self._root
+        while True:
+            left_size = _size(node.left)
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node
+            else:
+                index -= left_size + 1
+                node = node.right
+
+
+class TrackQueue(wavelink.Queue):
+    """Queue that stores CompactTrack entries and hands out full tracks.
+
+    Indexing and iterating return the compact entries; get builds the
+    Playable for the track that is about to play.
+    """
+
+    def __init__(self, *, history: bool = True):
+        super().__init__(history=history)
+        self._items = TrackTree()
+
+    @staticmethod
+    def _check_compatibility(item: object) -> bool:
+        if not isinstance(item, (wavelink.Playable, CompactTrack)):
+            raise TypeError("This queue is restricted to Playable objects.")
+        return True
+
+    def get(self) -> wavelink.Playable:
+        track = super().get()
+        if isinstance(track, CompactTrack):
+            track = self._loaded = track.to_playable()
+        return track
+
+    @property
+    def duration(self) -> int:
+        return self._items.length
+
+    @property
+    def version(self) -> int:
+        return self._items.version
+
+    def iter_from(self, start: int) -> t.Iterator[CompactTrack]:
+        return self._items.iter_from(start)
+
+    def move(self, index: int, dest: int) -> CompactTrack:
+        track = self._items.pop(index)
+        self._items.insert(dest, track)
+        return track
+
+    @property
+    def fair(self) -> bool:
+        return self._items.fair
+
+    @fair.setter
+    def fair(self, value: bool):
+        self._items.fair = value
+
+    def fair_state(self) -> dict | None:
+        return self._items.fair_state()
+
+    def restore(self, values: list[wavelink.Playable | CompactTrack], fair: dict | None = None):
+        self._items.restore(values, fair)
+
+    def shuffle(self, seed: int | None = None) -> int:
+        return self._items.shuffle(seed)
+
+    def copy(self) -> "TrackQueue":
+        copy_queue = TrackQueue(history=self.history is not None)
+        copy_queue._items = self._items.copy()
+        return copy_queue
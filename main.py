@@ -1,4 +1,11 @@
 # Labbebot in python
+import time
+STARTED = time.perf_counter()
+
+import asyncio
+import math
+import multiprocessing
+import signal
 from pathlib import Path
 import os
 import discord
@@ -6,6 +13,23 @@ import wavelink
 from discord.ext import commands
 from dotenv import load_dotenv
 
+from cogs.commands.utils import SearchCache as search_cache
+from cogs.commands.utils import Nodes as nodes
+from cogs.commands.utils import Snapshot as snapshot
+from cogs.commands.utils import Constants as constants
+from cogs.commands.utils.Metrics import MetricsServer
+from cogs.commands.utils import Tracing as tracing
+from cogs.commands.utils.History import history
+from cogs.commands.utils.TrackIndex import track_index
+from cogs.commands.utils.Outbox import outbox
+from cogs.commands.utils import Logger as log
+from cogs.commands.utils.Logger import logger
+from cogs.commands.utils.Profiler import StartupProfiler
+from cogs.commands.utils.Cluster import ClusterClient, ClusterHub, cluster_path, recommended_shards, split_shards
+
+profiler = StartupProfiler(STARTED)
+profiler.record("imports", profiler.elapsed)
+
 load_dotenv()
 
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
@@ -20,6 +44,14 @@ LAVALINK_ADDRESS = os.getenv("LAVALINK_ADDRESS")
 SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_id")
 SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
 
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+METRICS_PORT = os.getenv("METRICS_PORT")
+METRICS_HOST = os.getenv("METRICS_HOST", constants.METRICS_HOST)
+
+CLUSTERS = int(os.getenv("CLUSTERS") or 0)
+SHARDS = os.getenv("SHARDS")
+
 # --------------------
 #
 #         Bot
@@ -27,11 +59,16 @@ SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
 # --------------------
 
 
-class LabbeBot(commands.Bot):
+class LabbeBot(commands.AutoShardedBot):
     bot_app_info: discord.AppInfo
 
-    def __init__(self):
+    def __init__(self, *, cluster: int | None = None, shard_ids: list[int] | None = None, shard_count: int | None = None):
         self._cogs = [p.stem for p in Path(".").glob("./cogs/*.py")]
+        self.metrics: MetricsServer | None = None
+        self.cluster = cluster
+        self.ipc: ClusterClient | None = None
+        self.snapshot_path = cluster_path(constants.SNAPSHOT_PATH, cluster)
+        self._shutdown: asyncio.Task | None = None
 
         intents = discord.Intents.default()
         intents.members = True
@@ -40,57 +77,211 @@ class LabbeBot(commands.Bot):
         super().__init__(
             command_prefix=commands.when_mentioned_or(PREFIX),
             case_insensitive=True,
-            intents=intents
+            intents=intents,
+            activity=DISCORD_STATUS,
+            shard_ids=shard_ids,
+            shard_count=shard_count
         )
 
     async def setup_hook(self):
-        self.bot_app_info = await self.application_info()
+        # Runs exactly once before the gateway connects, unlike on_ready which
+        # fires again after every reconnect.
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(self.close()))
+        except NotImplementedError:
+            pass
 
-        node = wavelink.Node(
-            uri=LAVALINK_ADDRESS,
-            password=LAVALINK_PASS
-        )
-        await wavelink.Pool.connect(nodes=[node], client=self, cache_capacity=100)
+        tracing.instrument_http(self.http)
+
+        if self.cluster is not None:
+            self.ipc = ClusterClient(self.cluster)
+            self.ipc.handlers.update(guilds=self.cluster_guilds, stats=self.cluster_stats)
+            await self.ipc.connect()
+
+        with profiler.phase("application_info"):
+            self.bot_app_info = await self.application_info()
+            self.client_id = self.bot_app_info.id
+
+        with profiler.phase("cog_load"):
+            await self.initialize_cogs()
+
+        with profiler.phase("lavalink_connect"):
+            await wavelink.Pool.connect(
+                nodes=nodes.build_nodes(LAVALINK_ADDRESS, LAVALINK_PASS),
+                client=self,
+                cache_capacity=100
+            )
+            await nodes.refresh_stats()
+
+        if METRICS_PORT:
+            with profiler.phase("metrics"):
+                self.metrics = MetricsServer(self, METRICS_HOST, int(METRICS_PORT) + (self.cluster or 0))
+                await self.metrics.start()
+
+        self._gateway_started = time.perf_counter()
 
     async def on_ready(self):
-        self.client_id = (await self.application_info()).id
+        if profiler.reported:
+            logger.info("Bot ready again after reconnect")
+            return
 
-        await self.change_presence(activity=DISCORD_STATUS)
-        await self.initialize_cogs()
-        await self.list_guilds()
+        profiler.record("gateway", time.perf_counter() - self._gateway_started)
+        with profiler.phase("guild_listing"):
+            await self.list_guilds()
+        with profiler.phase("player_resume"):
+            await snapshot.restore_all(self, self.snapshot_path)
+        profiler.report()
 
     async def initialize_cogs(self):
-        print("Loading cogs...")
-        for cog in self._cogs:
-            await self.load_extension(f"cogs.{cog}")
-            print(f"Loaded {cog} cog. ")
+        await asyncio.gather(*(self.load_cog(cog) for cog in self._cogs))
+
+    async def load_cog(self, cog: str):
+        start = time.perf_counter()
+        await self.load_extension(f"cogs.{cog}")
+        logger.info("Loaded cog", extra={"cog": cog, "duration_ms": round((time.perf_counter() - start) * 1000, 1)})
 
     async def list_guilds(self):
-        print("\nYou are now live in the following guilds: \n")
-        async for guild in self.fetch_guilds(limit=5):
-            print(f'{guild.name}(id: {guild.id})')
-        print(" ")
+        clusters = await self.global_request("guilds")
+        guilds = [guild for answer in clusters.values() if answer for guild in answer["sample"]]
+        count = sum(answer["count"] for answer in clusters.values() if answer)
+        logger.info("Live in guilds", extra={"guilds": guilds[:5], "count": count, "clusters": len(clusters)})
+
+    async def global_request(self, op: str) -> dict[int, dict]:
+        if self.ipc is not None:
+            return await self.ipc.request(op)
+        handlers = {"guilds": self.cluster_guilds, "stats": self.cluster_stats}
+        return {0: await handlers[op]()}
+
+    async def cluster_guilds(self) -> dict:
+        return {
+            "count": len(self.guilds),
+            "sample": [{"guild": guild.name, "guild_id": guild.id} for guild in self.guilds[:5]]
+        }
+
+    async def cluster_stats(self) -> dict:
+        players = [p for p in self.voice_clients if isinstance(p, wavelink.Player)]
+        return {
+            "shards": sorted(self.shards),
+            "guilds": len(self.guilds),
+            "players": len(players),
+            "playing": sum(p.playing for p in players),
+            "queued": sum(len(p.queue) for p in players),
+            "latency_ms": round(self.latency * 1000) if math.isfinite(self.latency) else None
+        }
 
     async def on_connect(self):
-        print(f"Connected to Discord (latency: {self.latency*1000:,.0f} ms). ")
+        logger.info("Connected to Discord")
 
     async def close(self):
-        print("Closing on keyboard interrupt...")
-        print("Shutting down bot... ")
+        # SIGTERM, Ctrl+C and the launcher can all ask to close; every caller
+        # waits for the same shutdown.
+        if self._shutdown is None:
+            self._shutdown = asyncio.create_task(self._shut_down())
+        await self._shutdown
+
+    async def _shut_down(self):
+        logger.info("Shutting down bot")
+        try:
+            snapshot.save(self, self.snapshot_path)
+        except Exception:
+            logger.exception("Failed to save player snapshot")
+        await outbox.flush()
+        if self.metrics is not None:
+            await self.metrics.close()
+        await search_cache.cache.close()
+        await history.close()
+        track_index.close()
+        if self.ipc is not None:
+            await self.ipc.close()
         await super().close()
+        log.shutdown()
 
     async def on_disconnect(self):
-        print("Bot disconnected. ")
+        logger.warning("Bot disconnected")
 
     async def on_resumed(self):
-        print("Bot resumed. ")
+        logger.info("Bot resumed")
+
+    async def invoke(self, ctx: commands.Context):
+        ctx.received_at = time.perf_counter()
+        await super().invoke(ctx)
 
     async def on_message(self, message):
         if not message.author.bot:
             await self.process_commands(message)
 
 
-bot = LabbeBot()
+# --------------------
+#
+#       Launcher
+#
+# --------------------
+
+
+def run_cluster(cluster: int | None = None, shard_ids: list[int] | None = None, shard_count: int | None = None):
+    log.setup(
+        LOG_LEVEL,
+        path=cluster_path(constants.LOG_PATH, cluster),
+        slow_path=cluster_path(constants.SLOW_LOG_PATH, cluster)
+    )
+    bot = LabbeBot(cluster=cluster, shard_ids=shard_ids, shard_count=shard_count)
+    bot.run(DISCORD_TOKEN, log_handler=None)
+
+
+async def launch(clusters: int):
+    shard_count = int(SHARDS) if SHARDS else await recommended_shards(DISCORD_TOKEN)
+    ranges = split_shards(shard_count, clusters)
+    logger.info("Launching clusters", extra={"clusters": len(ranges), "shards": shard_count})
+
+    hub = ClusterHub()
+    await hub.start()
+
+    context = multiprocessing.get_context("spawn")
+    processes: dict[int, multiprocessing.Process] = {}
+
+    def start(cluster: int):
+        process = context.Process(target=run_cluster, args=(cluster, ranges[cluster], shard_count), name=f"cluster-{cluster}")
+        process.start()
+        processes[cluster] = process
+
+    stopping = asyncio.Event()
+
+    def stop(sig: signal.Signals):
+        stopping.set()
+        # Ctrl+C already reaches every process in the group, SIGTERM does not.
+        if sig is signal.SIGTERM:
+            for process in processes.values():
+                process.terminate()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop, sig)
+        except NotImplementedError:
+            pass
+
+    for cluster in range(len(ranges)):
+        start(cluster)
+
+    while not stopping.is_set():
+        try:
+            await asyncio.wait_for(stopping.wait(), timeout=constants.CLUSTER_CHECK_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        for cluster, process in list(processes.items()):
+            if not process.is_alive() and not stopping.is_set():
+                logger.warning("Cluster exited, restarting", extra={"cluster": cluster, "exit_code": process.exitcode})
+                await asyncio.sleep(constants.CLUSTER_RESTART_DELAY)
+                start(cluster)
+
+    await asyncio.gather(*(asyncio.to_thread(p.join) for p in processes.values()))
+    await hub.close()
+
 
 if __name__ == "__main__":
-    bot.run(DISCORD_TOKEN)
+    if CLUSTERS > 1:
+        log.setup(LOG_LEVEL, path=cluster_path(constants.LOG_PATH, "launcher"), slow_path=None)
+        asyncio.run(launch(CLUSTERS))
+        log.shutdown()
+    else:
+        run_cluster(shard_count=int(SHARDS) if SHARDS else None)